@@ -2,16 +2,20 @@ import customtkinter
 from pathlib import Path
 import serial
 import time
-from datetime import datetime
 from PIL import Image, ImageTk
 import serial.tools.list_ports 
-import threading
-import queue
-import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+from serial_ingest import SerialIngest, LineFramer
+from frame_codec import FrameLayout, BinaryFramer
+from telemetry_store import TelemetryStore, feed_store, parse_text_records
+from plot_renderer import PlotRenderer
+from console_view import ConsoleView
+from recorder import Recorder
+from instrumentation import PipelineStats, StatsExporter, format_hud
+from sequencer import CommandSequencer, CoalescingSender, POWER_COMMAND, load_profile
+from log_viewer import SessionLog, LogViewer
 
 customtkinter.deactivate_automatic_dpi_awareness()
 class MTQtesterApp(customtkinter.CTk):
@@ -24,10 +28,11 @@ class MTQtesterApp(customtkinter.CTk):
         # self.wm_resizable(width=False, height=False)
         self.title("MTQ Tester")
 
-        self.received_dataBuffer = b''
-
         # serial connection attribute
         self.serial_connection = None
+        self.ingest = None
+        self.rx_queue = None
+        self.recorder = None
         self.deviceConnected = False
 
         # MTQ control vals
@@ -44,15 +49,20 @@ class MTQtesterApp(customtkinter.CTk):
             "MTQ OFF": [b'\x3A', b'\x00'],
             "STOP": [b'\x08', b'\x00']
         }
+        # binary RX frames: #T + data stream register + MTQ time, Gyro X/Y/Z as float32 + sum8 checksum + terminator
+        self.frame_layout = FrameLayout(header=b'#T', register=b'\x20', checksum="sum8", terminator=self.terminator)
+        self.decode_records = parse_text_records
 
         # plotter vars
-        self.lines = {}
-        self.timestamps = []
-        self.plot_data_queue = queue.Queue()
-        self.read_thread = None
-        self.plot_thread = None
-        self.stop_event = threading.Event()
-        self.lock = threading.Lock()
+        self.plot_window = 3000             # samples shown on the live plot
+        self.plot_fps = 30                  # redraw rate, independent of the sample rate
+        self.telemetry = TelemetryStore(capacity=60000)   # 10 min of 100 Hz data
+        self.plot_data_queue = None
+        # data path counters and latency histograms, snapshot once per stats interval
+        self.pipeline_stats = PipelineStats()
+        self.stats_exporter = None
+        self.stats_interval_ms = 1000
+        self.reported_recorder_error = None
 
         # Set up the grid layout
         self.grid_rowconfigure((0,1,4,5), weight=1)
@@ -89,7 +99,7 @@ class MTQtesterApp(customtkinter.CTk):
         self.console_frame.grid_rowconfigure(1, weight=1)
         self.console_frame.grid_columnconfigure(1, weight=1)
         # console hex/utf8 option menu
-        self.console_dtype_menu = customtkinter.CTkSegmentedButton(self.console_frame,width=300)
+        self.console_dtype_menu = customtkinter.CTkSegmentedButton(self.console_frame,width=300, command=self.change_console_dtype)
         self.console_dtype_menu.grid(row=0, column=0, padx=(10, 5), pady=6, sticky="nws")
         self.console_dtype_menu.configure(values=["Utf8","Hex","Dec","Binary"])
         self.console_dtype_menu.set("Utf8")
@@ -105,11 +115,14 @@ class MTQtesterApp(customtkinter.CTk):
         self.textbox_scrollbar = customtkinter.CTkScrollbar(self.console_frame, command=self.console_textbox.yview, width=15)
         self.textbox_scrollbar.grid(row=1, column=0,columnspan =2,padx=10, pady = 10,sticky="nse")
         self.console_textbox.configure(yscrollcommand=self.textbox_scrollbar.set)
-        self.console_textbox_scroll = True
         self.console_textbox.tag_config('timestamp', foreground='grey')
         self.console_textbox.tag_config('received', foreground='white')
         self.console_textbox.tag_config('sent', foreground='yellow')
         self.console_textbox.tag_config('error', foreground = "red")
+        # batches received lines into the textbox from the main loop and caps its length
+        self.console = ConsoleView(self.console_textbox, max_lines=2000, history=20000, flush_ms=100, mode=self.console_dtype_menu.get(), feed=self.feed_console_data, stats=self.pipeline_stats)
+        self.pipeline_stats.console = self.console
+        self.console.start()
 
         # plotter frame
         self.plotter_frame = customtkinter.CTkFrame(self, width=502, height=486, corner_radius=10)
@@ -119,6 +132,14 @@ class MTQtesterApp(customtkinter.CTk):
 
         self.btn_clear_chart = customtkinter.CTkButton(self.plotter_frame, text="Clear", width=60,command=self.clear_chart)
         self.btn_clear_chart.grid(row=0, column = 1, padx=(10,10), pady=6, sticky="e")
+        # opens a recorded session on the same canvas, the live plot keeps collecting meanwhile
+        self.btn_open_log = customtkinter.CTkButton(self.plotter_frame, text="Open Log", width=70,command=self.toggle_log_view)
+        self.btn_open_log.grid(row=0, column = 1, padx=(10,80), pady=6, sticky="e")
+        # RX stream format, switching it reconnects like a baud rate change
+        self.rx_mode_menu = customtkinter.CTkSegmentedButton(self.plotter_frame, command=self.disconenct_to_serial)
+        self.rx_mode_menu.grid(row=0, column=0, padx=(10,5), pady=6, sticky="w")
+        self.rx_mode_menu.configure(values=["Text","Binary"])
+        self.rx_mode_menu.set("Text")
 
         # graph area
         self.graph_frame = customtkinter.CTkFrame(self.plotter_frame, corner_radius=10, fg_color="#1E1E1E")
@@ -136,6 +157,13 @@ class MTQtesterApp(customtkinter.CTk):
         self.ax.spines['top'].set_color("#1E1e1e")
         self.ax.tick_params(axis='x', colors='grey')
         self.ax.tick_params(axis='y', colors='grey')
+        self.plot_renderer = PlotRenderer(self, self.canvas, self.ax, self.telemetry, window=self.plot_window, fps=self.plot_fps, feed=self.feed_plot_data, stats=self.pipeline_stats)
+        self.pipeline_stats.renderer = self.plot_renderer
+        self.plot_renderer.start()
+        self.log_viewer = None
+        self.log_ax = None
+        self.log_summary_after_id = None
+        self.log_toolbar = NavigationToolbar2Tk(self.canvas, self.graph_frame, pack_toolbar=False)
 
         # CMD selector frame
         self.cmdSel_frame = customtkinter.CTkFrame(self, width=502, height=115, corner_radius=10)
@@ -152,11 +180,11 @@ class MTQtesterApp(customtkinter.CTk):
         self.Z_label = customtkinter.CTkLabel(self.cmdSel_frame, text="Z", font=customtkinter.CTkFont(family="Inter" ,size = 16, weight="normal"))
         self.Z_label.grid(row=3, column=0,padx=(10,0),pady=2, sticky = "w")
 
-        self.slider_X = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr, height=25,  command=self.update_slider_vals)
+        self.slider_X = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr, height=25,  command=lambda value: self.update_slider_vals(self.pwrX_label, value))
         self.slider_X.grid(row=1, column=1, padx=(5, 5), pady=1, sticky="we")
-        self.slider_Y = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr,height=25,  command=self.update_slider_vals)
+        self.slider_Y = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr,height=25,  command=lambda value: self.update_slider_vals(self.pwrY_label, value))
         self.slider_Y.grid(row=2, column=1, padx=(5, 5),pady=1,  sticky="we")
-        self.slider_Z = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr,height=25, command=self.update_slider_vals)
+        self.slider_Z = customtkinter.CTkSlider(self.cmdSel_frame, from_=self.MTQ_min_pwr, to=self.MTQ_max_pwr, number_of_steps=self.MTQ_max_pwr,height=25, command=lambda value: self.update_slider_vals(self.pwrZ_label, value))
         self.slider_Z.grid(row=3, column=1, padx=(5, 5), pady=1, sticky="we")
         self.pwrX_label = customtkinter.CTkEntry(self.cmdSel_frame, placeholder_text=str(int(self.slider_X.get())),border_width =0,  border_color='#2B2B2B',fg_color='transparent', font=customtkinter.CTkFont(family="Inter" ,size = 12, weight="bold"))
         self.pwrX_label.grid(row=1, column=2, sticky = "nswe")
@@ -165,6 +193,13 @@ class MTQtesterApp(customtkinter.CTk):
         self.pwrZ_label = customtkinter.CTkEntry(self.cmdSel_frame, placeholder_text=str(int(self.slider_Z.get())),border_width =0, border_color='#2B2B2B',fg_color='transparent', font=customtkinter.CTkFont(family="Inter" ,size = 12, weight="bold"))
         self.pwrZ_label.grid(row=3, column=2, sticky = "nswe")
 
+        # live mode sends slider changes straight away, rate capped and coalesced to the latest value
+        self.live_switch = customtkinter.CTkSwitch(self.cmdSel_frame, text="Live", width=60, command=self.toggle_live_mode)
+        self.live_switch.grid(row=0, column=1, columnspan=2, padx=(0,5), sticky="e")
+        self.live_sender = None
+        self.live_max_rate = 20     # frames per second
+        self.tx_cmd_after_id = None
+
         self.pwrsel_label = customtkinter.CTkLabel(self.cmdSel_frame, text="Select Command", font=customtkinter.CTkFont(family="Inter" ,size = 16, weight="bold"))
         self.pwrsel_label.grid(row=0, column=3,rowspan=2,padx=(0,60), sticky="se")
         self.cmdSel_dropdown = customtkinter.CTkComboBox(self.cmdSel_frame, width= 200, values=list(self.MTQ_ctrl_commands.keys()), command=self.update_tx_CMD)
@@ -187,6 +222,11 @@ class MTQtesterApp(customtkinter.CTk):
         self.btn_browse_folder.grid(row=0, column = 0, padx=(0,5), pady=0, sticky = "e")
         self.save_data_button = customtkinter.CTkButton(self.output_path_frame, text="Save Data", width=100,command=self.save_data)
         self.save_data_button.grid(row = 1, column = 1, padx=15,sticky ="e")
+        # recording format, applies from the next recording on
+        self.record_format_menu = customtkinter.CTkSegmentedButton(self.output_path_frame, width=100)
+        self.record_format_menu.grid(row = 0, column = 1, padx=15, pady=(5,2), sticky ="e")
+        self.record_format_menu.configure(values=["CSV","NPY"])
+        self.record_format_menu.set("CSV")
 
         # tx_console_frame frame
         self.tx_console_frame = customtkinter.CTkFrame(self, corner_radius=10)
@@ -204,12 +244,23 @@ class MTQtesterApp(customtkinter.CTk):
         self.tx_console_dtype_menu.grid(row=0, column=0, columnspan = 2, padx = (5,200), pady=5, sticky="nse")
         self.tx_console_dtype_menu.configure(values=[" Utf8 ", " Hex ","Dec","Binary"])
         self.tx_console_dtype_menu.set(" Hex ")
+        # scripted test profiles, see sequencer.CommandSequencer for the format
+        self.sequencer = CommandSequencer(self.send_frame, self.encode_command, self.MTQ_ctrl_commands, self.MTQ_min_pwr, self.MTQ_max_pwr)
+        self.profile_button = customtkinter.CTkButton(self.tx_console_frame, text="Run Profile", width=100, command=self.toggle_profile)
+        self.profile_button.grid(row=0, column=1, padx=10, pady=5, sticky="e")
 
         # message frame
         self.message_frame = customtkinter.CTkFrame(self,fg_color='transparent' )
         self.message_frame.grid(row = 5, column = 0, columnspan =2, padx=(10,0),pady=5,sticky="nswe")
         self.message_box = customtkinter.CTkLabel(self.message_frame, text="Connect to begin", font=customtkinter.CTkFont(family="Inter" ,size = 12))
-        self.message_box.grid(sticky = "w")
+        self.message_box.grid(row=0, column=0, sticky = "w")
+        self.message_frame.grid_columnconfigure(1, weight=1)
+        # performance HUD, toggled with the Stats button
+        self.stats_label = customtkinter.CTkLabel(self.message_frame, text="", text_color="grey", font=customtkinter.CTkFont(family="Inter" ,size = 11))
+        self.stats_button = customtkinter.CTkButton(self.message_frame, text="Stats", width=50, height=20, command=self.toggle_stats_hud)
+        self.stats_button.grid(row=0, column=2, padx=10, sticky="e")
+        self.show_stats = False
+        self.stats_after_id = self.after(self.stats_interval_ms, self.update_pipeline_stats)
 
     def relative_to_assets(self, path: str) -> Path:
         return self.ASSETS_PATH / Path(path)
@@ -226,13 +277,10 @@ class MTQtesterApp(customtkinter.CTk):
 
     def disconenct_to_serial(self, event=None):
         if self.deviceConnected:
+            self.sequencer.stop()
             self.deviceConnected = False
-            self.stop_event.set()
-            if self.read_thread and self.read_thread.is_alive():
-                self.read_thread.join(timeout=1)
-            if self.plot_thread and self.plot_thread.is_alive():
-                self.plot_thread.join(timeout=1)
-            # time.sleep(0.1)
+            self.ingest.stop()
+            self.stop_recording()
             self.serial_connection.close()
             self.message_box.configure(text="Device disconnected")
             self.connect_button.configure(text="connect", fg_color=self.connect_button_defColor, hover_color="#144870")
@@ -242,14 +290,22 @@ class MTQtesterApp(customtkinter.CTk):
             selected_port = self.com_port_dropdown.get()
             selected_baud_rate = self.baud_rate_dropdown.get()
             try:
-                self.serial_connection = serial.Serial(selected_port, selected_baud_rate)
+                # the timeout lets the ingest reader block in read() instead of polling in_waiting
+                self.serial_connection = serial.Serial(selected_port, selected_baud_rate, timeout=0.1)
+                if self.rx_mode_menu.get() == "Binary":
+                    self.ingest = SerialIngest(self.serial_connection, framer=BinaryFramer(self.frame_layout))
+                    self.decode_records = self.frame_layout.decode
+                    self.console_dtype_menu.set("Hex")
+                    self.console.set_mode("Hex")
+                else:
+                    self.ingest = SerialIngest(self.serial_connection, framer=LineFramer(self.terminator))
+                    self.decode_records = parse_text_records
+                self.rx_queue = self.ingest.subscribe(maxsize=1024, overflow="drop_oldest")
+                self.plot_data_queue = self.ingest.subscribe(maxsize=1024, overflow="drop_oldest")
+                self.pipeline_stats.attach(self.ingest, {"console": self.rx_queue, "plot": self.plot_data_queue})
+                self.start_recording()
+                self.ingest.start()
                 self.deviceConnected = True
-                if self.read_thread is None or not self.read_thread.is_alive():
-                    self.stop_event.clear()
-                    self.read_thread = threading.Thread(target=self.read_serial)
-                    self.read_thread.start()
-                    self.plot_thread = threading.Thread(target=self.animate_plot)
-                    self.plot_thread.start()
                 self.message_box.configure(text="Connected to "+selected_port+" Baud rate: "+selected_baud_rate)
                 self.connect_button.configure(text="Disconnect",fg_color="green",hover_color="darkgreen")
             except serial.SerialException as e:
@@ -258,132 +314,170 @@ class MTQtesterApp(customtkinter.CTk):
         else:
             self.disconenct_to_serial()
 
-    def read_serial(self):
-        buffer = b''
-        while not self.stop_event.is_set():
-            try:
-                with self.lock:
-                    if self.serial_connection.in_waiting:
-                        data = self.serial_connection.read(self.serial_connection.in_waiting)
-                        buffer += data
-                        if b'\n' in buffer:
-                            lines = buffer.split(b'\n')
-                            for line in lines[:-1]:
-                                self.plot_data_queue.put(line.decode('utf-8'))
-                                self.display_message(line+b'\n', msg_type="received")
-                            buffer = lines[-1]
-            except serial.SerialException as e:
-                print("Serial error:", e)
-                self.stop_event.set()
+    # called by the console view on every flush, hands received lines from the ingest engine to the console
+    def feed_console_data(self):
+        if self.rx_queue is None:
+            return
+        # binary frames carry their own terminator
+        terminator = b'' if isinstance(self.ingest.framer, BinaryFramer) else b'\n'
+        self.console.extend_batches(self.rx_queue.drain(), "received", terminator=terminator)
+        if self.deviceConnected and not self.ingest.is_running() and self.ingest.error is not None:
+            error = self.ingest.error
+            print("Serial error:", error)
+            self.disconenct_to_serial()
+            self.message_box.configure(text=f"Serial error: {error}")
 
-    def display_message(self, msg, msg_type):
-        timestamp = datetime.now().strftime("%H:%M:%S,")
-        self.console_textbox.insert(customtkinter.END, f"{timestamp} ", 'timestamp')
+    def update_pipeline_stats(self):
+        snapshot = self.pipeline_stats.snapshot()
+        if self.stats_exporter is not None:
+            try:
+                self.stats_exporter.write(snapshot)
+            except OSError as e:
+                self.close_stats_exporter()
+                self.message_box.configure(text=f"Error writing stats: {e}")
+        # a failed recorder has stopped saving, tell the operator now rather than at the next Save Data
+        recorder = self.recorder
+        if recorder is not None and recorder.error is not None and recorder.error is not self.reported_recorder_error:
+            self.reported_recorder_error = recorder.error
+            print("Recording error:", recorder.error)
+            self.message_box.configure(text=f"Recording stopped: {recorder.error}")
+        if self.show_stats:
+            self.stats_label.configure(text=format_hud(snapshot))
+        self.stats_after_id = self.after(self.stats_interval_ms, self.update_pipeline_stats)
+
+    def toggle_stats_hud(self):
+        self.show_stats = not self.show_stats
+        if self.show_stats:
+            self.stats_label.grid(row=0, column=1, padx=10, sticky="e")
+            self.stats_button.configure(border_width = 2)
+        else:
+            self.stats_label.grid_remove()
+            self.stats_button.configure(border_width = 0)
+
+    def change_console_dtype(self, value):
+        self.console.set_mode(value)
+
+    # called by the plot renderer once per frame, merges everything received since the last frame
+    def feed_plot_data(self):
+        if self.plot_data_queue is None:
+            return
+        feed_store(self.telemetry, self.plot_data_queue.drain(), self.decode_records, stats=self.pipeline_stats)
+
+    # streams everything the ingest engine receives (and sends) to timestamped files in the output folder
+    def start_recording(self):
+        recorder = Recorder(self.output_path_entry.get(), fmt=self.record_format_menu.get().lower(), decode=self.decode_records)
+        recorder.attach(self.ingest)
         try:
-            if(self.console_dtype_menu.get() =="Utf8"):
-                self.console_textbox.insert(customtkinter.END, msg.decode('utf-8'), msg_type)
-            elif(self.console_dtype_menu.get() == "Hex"):
-                hex_data = '  '.join(f'{b:02x}' for b in msg)
-                self.console_textbox.insert(customtkinter.END, hex_data + '\n', msg_type)
-            elif(self.console_dtype_menu.get() == "Dec"):
-                decimal_data = '  '.join(f'{b:03}' for b in msg)
-                self.console_textbox.insert(customtkinter.END, decimal_data + '\n', msg_type)
-            else:
-                binary_data = '  '.join(f'{b:08b}' for b in msg)
-                self.console_textbox.insert(customtkinter.END, binary_data + '\n', msg_type)
-            if self.console_textbox_scroll:
-                self.console_textbox.yview(customtkinter.END)
-        except:
-            self.console_textbox.insert(customtkinter.END, f"Message decoding error\n", 'error')
-    
-    def animate_plot(self):
-        while not self.stop_event.is_set():
+            recorder.start()
+            # stats are exported next to the recording for post-test analysis
+            stats_exporter = StatsExporter(recorder.directory / f"{recorder.base_name}_stats.jsonl")
+        except OSError as e:
+            recorder.finalize()
+            print("Recording error:", e)
+            self.message_box.configure(text=f"Error opening output files: {e}")
+            return
+        self.recorder = recorder
+        self.stats_exporter = stats_exporter
+        self.pipeline_stats.queues["recorder"] = recorder.samples
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.finalize()
+            self.pipeline_stats.queues.pop("recorder", None)
+        self.close_stats_exporter()
+        return recorder
+
+    def close_stats_exporter(self):
+        stats_exporter, self.stats_exporter = self.stats_exporter, None
+        if stats_exporter is not None:
             try:
-                # Blocking call, wait for new data
-                line = self.plot_data_queue.get(timeout=1)  # Timeout to periodically check stop_event
-                values = list(map(float, line.strip().split(',')))
-            except queue.Empty:
-                continue  # No data, just continue the loop
-            except ValueError:
-                values = None
-
-            if values:
-                timestamp = datetime.now()
-                self.timestamps.append(timestamp)
-                if len(self.timestamps) > 100:
-                    self.timestamps.pop(0)  # Keep the last 100 timestamps
-                for idx, value in enumerate(values):
-                    label = f'Value {idx+1}'
-                    if label not in self.lines:
-                        line, = self.ax.plot([], [], label=label)
-                        self.lines[label] = (line, [])
-                    line, data = self.lines[label]
-                    data.append(value)
-                    if len(data) > 100:
-                        data.pop(0)  # Keep the last 100 data points
-                    line.set_data(self.timestamps[-len(data):], data)
-
-                # Only recompute limits based on visible lines
-                visible_lines = [line for line, _ in self.lines.values() if line.get_visible()]
-                if visible_lines:
-                    x_data = np.concatenate([line.get_xdata() for line in visible_lines])
-                    y_data = np.concatenate([line.get_ydata() for line in visible_lines])
-                    self.ax.set_xlim(x_data.min(), x_data.max())
-                    self.ax.set_ylim(y_data.min(), y_data.max())
-                else:
-                    self.ax.set_xlim(auto=True)
-                    self.ax.set_ylim(auto=True)
-
-                self.ax.relim()
-                self.ax.autoscale_view()
-                self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%M:%S'))
-                legend = self.ax.legend(loc='upper left')
-
-                # Connect toggle function to legend
-                for legend_line in legend.get_lines():
-                    legend_line.set_picker(True)
-                self.fig.canvas.mpl_connect('pick_event', self.toggle_line)
-                self.canvas.draw()
-
-    # Function to toggle line visibility
-    def toggle_line(self, event):
-        legend = event.artist
-        label = legend.get_label()
-        line = self.lines[label][0]
-        visible = not line.get_visible()
-        line.set_visible(visible)
-        legend.set_alpha(1.0 if visible else 0.6)
-        self.canvas.draw()
+                stats_exporter.close()
+            except OSError as e:
+                print("Stats export error:", e)
 
+    # finalizes the current recording; if still connected a new one is started right away
     def save_data(self):
-        output_path = self.output_path_entry.get()
-        output_path += '\output.csv'
-        data = self.console_textbox.get("1.0", customtkinter.END).strip().split('\n')
-        if len(data) > 1:
-            try:
-                with open(output_path, mode='w', newline='') as csvfile:
-                    csvfile.write('Timestamp,'+'MTQ time,'+"Gyro X,"+"Gyro Y,"+"Gyro Z\n")
-                    for line in data:
-                        csvfile.write(str(line) + '\n')
-                self.message_box.configure(text_color="green",text=f"Data saved to {output_path}")
-                
-            except Exception as e:
-                self.message_box.configure(text="Error Generating CSV data")
-        else:
+        recorder = self.stop_recording()
+        if recorder is None or not recorder.rows:
             self.message_box.configure(text="No data to save")
-        
+        elif recorder.error is not None:
+            self.message_box.configure(text=f"Error writing data: {recorder.error}")
+        else:
+            data_paths = [str(path) for path in recorder.paths if path.suffix != '.bin']
+            self.message_box.configure(text_color="green",text=f"Data saved to {', '.join(data_paths)}")
+        if self.deviceConnected:
+            self.start_recording()
+
     def clear_console(self):
-        self.console_textbox.delete(0.0,'end')
+        self.console.clear()
     
     def clear_chart(self):
-        self.lines = {}
-        self.timestamps = []
-        self.ax.cla()
-        self.canvas.draw()
+        self.plot_renderer.reset()
+
+    def toggle_log_view(self):
+        if self.log_viewer is not None:
+            self.close_log_view()
+            return
+        log_path = customtkinter.filedialog.askopenfilename(filetypes=[("MTQ log", "*.csv *.npy")])
+        if not log_path:
+            return
+        self.message_box.configure(text=f"Loading {Path(log_path).name}...")
+        self.update_idletasks()
+        try:
+            log = SessionLog.load(log_path)
+        except (OSError, ValueError) as e:
+            self.message_box.configure(text=f"Could not open log: {e}")
+            return
+        if not len(log):
+            self.message_box.configure(text=f"No samples in {Path(log_path).name}")
+            return
+        self.plot_renderer.paused = True
+        self.ax.set_visible(False)
+        self.log_ax = self.fig.add_subplot(111)
+        self.style_axes(self.log_ax, self.fig.get_facecolor())
+        self.log_viewer = LogViewer(self.log_ax, log, on_view=self.schedule_log_summary)
+        # start a fresh view history, Home/Back/Forward must not refer to a previous log's axes
+        self.log_toolbar.update()
+        self.log_toolbar.pack(side=customtkinter.BOTTOM, fill=customtkinter.X, before=self.canvas.get_tk_widget())
+        self.btn_open_log.configure(text="Live")
+        self.canvas.draw_idle()
+
+    def close_log_view(self):
+        if self.log_summary_after_id is not None:
+            self.after_cancel(self.log_summary_after_id)
+            self.log_summary_after_id = None
+        # leave pan/zoom mode, it would otherwise keep grabbing mouse events over the live plot
+        if self.log_toolbar.mode == "pan/zoom":
+            self.log_toolbar.pan()
+        elif self.log_toolbar.mode == "zoom rect":
+            self.log_toolbar.zoom()
+        self.log_toolbar.update()
+        self.log_viewer.disconnect()
+        self.log_viewer = None
+        self.fig.delaxes(self.log_ax)
+        self.log_ax = None
+        self.log_toolbar.pack_forget()
+        self.ax.set_visible(True)
+        self.plot_renderer.paused = False
+        self.plot_renderer.render(force=True)
+        self.btn_open_log.configure(text="Open Log")
+        self.message_box.configure(text="")
+
+    # statistics of the visible range are recomputed once panning or zooming settles
+    def schedule_log_summary(self, t_start, t_end):
+        if self.log_summary_after_id is not None:
+            self.after_cancel(self.log_summary_after_id)
+        self.log_summary_after_id = self.after(200, self.show_log_summary, t_start, t_end)
+
+    def show_log_summary(self, t_start, t_end):
+        self.log_summary_after_id = None
+        if self.log_viewer is not None:
+            self.message_box.configure(text=self.log_viewer.visible_summary(t_start, t_end))
 
     def toggle_scroll_lock(self):
-        self.console_textbox_scroll = not self.console_textbox_scroll
-        if self.console_textbox_scroll:
+        self.console.autoscroll = not self.console.autoscroll
+        if self.console.autoscroll:
             self.btn_lock.configure(border_width = 0)
         else:
             self.btn_lock.configure(border_width = 2)
@@ -403,6 +497,7 @@ class MTQtesterApp(customtkinter.CTk):
         return command
     
     def update_tx_CMD(self, event = None):
+        self.tx_cmd_after_id = None
         selected_command = self.cmdSel_dropdown.get()
         cmd_regID = list(self.MTQ_ctrl_commands.get(selected_command))[0]
         if selected_command != "MTQ Set Power":
@@ -413,27 +508,82 @@ class MTQtesterApp(customtkinter.CTk):
         self.tx_console_entry.delete(0, customtkinter.END)
         self.tx_console_entry.insert(0, command.hex())
 
+    # queues a frame for the writer thread and shows it in the console, safe to call from any thread
+    def send_frame(self, frame):
+        if self.deviceConnected and self.ingest.write(frame):
+            self.console.append(frame, 'sent')
+
     def send_serial(self):
         data_to_send = self.tx_console_entry.get()
         if self.deviceConnected:
             if data_to_send:
                 byte_data = bytearray.fromhex(data_to_send)
-                self.serial_connection.write(byte_data)
-                self.display_message(byte_data, 'sent')
+                self.send_frame(byte_data)
                 self.message_box.configure(text=self.cmdSel_dropdown.get()+" command sent")
             else:
                 self.message_box.configure(text="Tx console empty: Select command to send.")
         else:
                 self.message_box.configure(text="Device not connected yet")
 
-    def update_slider_vals(self, event = None):
-        self.pwrX_label.delete(0, customtkinter.END)
-        self.pwrY_label.delete(0, customtkinter.END)
-        self.pwrZ_label.delete(0, customtkinter.END)
-        self.pwrX_label.insert(0,str(int(self.slider_X.get())))
-        self.pwrY_label.insert(0,str(int(self.slider_Y.get())))
-        self.pwrZ_label.insert(0,str(int(self.slider_Z.get())))
-        self.update_tx_CMD()
+    def update_slider_vals(self, power_label, value):
+        # only the moved slider's entry changes, the Tx console is re-encoded at most every 50 ms
+        power_label.delete(0, customtkinter.END)
+        power_label.insert(0, str(int(value)))
+        if self.tx_cmd_after_id is None:
+            self.tx_cmd_after_id = self.after(50, self.update_tx_CMD)
+        if self.live_sender is not None and self.deviceConnected:
+            power = [int(self.slider_X.get()), int(self.slider_Y.get()), int(self.slider_Z.get())]
+            self.live_sender.submit(self.encode_command(self.MTQ_ctrl_commands[POWER_COMMAND][0], power))
+
+    def toggle_live_mode(self):
+        if self.live_switch.get():
+            self.live_sender = CoalescingSender(self.send_frame, max_rate=self.live_max_rate)
+            self.message_box.configure(text=f"Live mode: slider changes are sent at up to {self.live_max_rate} Hz")
+        elif self.live_sender is not None:
+            self.live_sender.stop()
+            self.live_sender = None
+            self.message_box.configure(text="Live mode off")
+
+    def toggle_profile(self):
+        if self.sequencer.is_running():
+            self.sequencer.stop()
+            return
+        if not self.deviceConnected:
+            self.message_box.configure(text="Device not connected yet")
+            return
+        profile_path = customtkinter.filedialog.askopenfilename(filetypes=[("Test profile", "*.json")])
+        if not profile_path:
+            return
+        try:
+            self.sequencer.start(load_profile(profile_path))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.message_box.configure(text=f"Invalid profile: {e}")
+            return
+        self.profile_button.configure(text="Stop Profile")
+        self.after(200, self.poll_profile)
+
+    # reports sequencer progress from the main loop while a profile runs
+    def poll_profile(self):
+        total = len(self.sequencer.schedule)
+        if self.sequencer.is_running():
+            self.message_box.configure(text=f"Profile running: {self.sequencer.sent}/{total} frames sent")
+            self.after(200, self.poll_profile)
+            return
+        self.profile_button.configure(text="Run Profile")
+        mean, p99, worst = self.sequencer.jitter_stats()
+        if self.sequencer.error is not None:
+            self.message_box.configure(text=f"Profile stopped: {self.sequencer.error}")
+        else:
+            self.message_box.configure(text=f"Profile done: {self.sequencer.sent}/{total} frames sent, jitter mean {mean:.2f} ms, p99 {p99:.2f} ms, max {worst:.2f} ms")
+
+    def style_axes(self, ax, background):
+        ax.set_facecolor(background)
+        ax.spines['left'].set_color("grey")
+        ax.spines['bottom'].set_color("grey")
+        ax.spines['right'].set_color(background)
+        ax.spines['top'].set_color(background)
+        ax.tick_params(axis='x', colors='grey')
+        ax.tick_params(axis='y', colors='grey')
 
     def change_appearance_mode_event(self, new_appearance_mode: str):
         customtkinter.set_appearance_mode(new_appearance_mode)
@@ -441,25 +591,27 @@ class MTQtesterApp(customtkinter.CTk):
             self.console_textbox.tag_config('received', foreground='black')
             self.graph_frame.configure(fg_color = "white")
             self.fig.patch.set_facecolor("white")
-            self.ax.set_facecolor("white")
-            self.ax.spines['left'].set_color("grey")
-            self.ax.spines['bottom'].set_color("grey")
-            self.ax.spines['right'].set_color("white")
-            self.ax.spines['top'].set_color("white")
+            for ax in (self.ax, self.log_ax):
+                if ax is not None:
+                    self.style_axes(ax, "white")
             self.canvas.draw_idle()
         elif new_appearance_mode == "Dark":
             self.console_textbox.tag_config('received', foreground='white')
             self.graph_frame.configure(fg_color = "#1e1e1e")
             self.fig.patch.set_facecolor("#1E1e1e")
-            self.ax.set_facecolor("#1E1e1e")
-            self.ax.spines['left'].set_color("grey")
-            self.ax.spines['bottom'].set_color("grey")
-            self.ax.spines['right'].set_color("#1E1e1e")
-            self.ax.spines['top'].set_color("#1E1e1e")
+            for ax in (self.ax, self.log_ax):
+                if ax is not None:
+                    self.style_axes(ax, "#1E1e1e")
             self.canvas.draw_idle()
 
     def on_closing(self):
+        self.after_cancel(self.stats_after_id)
+        self.sequencer.stop()
+        if self.live_sender is not None:
+            self.live_sender.stop()
         self.disconenct_to_serial()
+        self.plot_renderer.stop()
+        self.console.stop()
         self.quit()
         self.destroy()
 
@@ -0,0 +1,180 @@
+"""Throughput benchmarks for the MTQ tester data path.
+
+Stage benchmarks time each piece in isolation on a synthetic session:
+framing, decode, store append, plot render, console formatting and
+recording. The end-to-end benchmark replays the same session through
+replay.HeadlessPipeline. For every stage it reports samples/s, CPU time and
+peak traced memory. End to end it also reports latency percentiles, CPU
+load and peak RSS.
+
+    python benchmark.py --samples 200000
+    python benchmark.py --samples 50000 --binary --rate 1000 --speed 1 --pty
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from console_view import format_payload
+from frame_codec import BinaryFramer, FrameLayout
+from recorder import Recorder
+from replay import latency_percentiles, replay, synthetic_session
+from serial_ingest import Batch, LineFramer
+from telemetry_store import TelemetryStore, parse_text_records
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _chunked(stream, size=4096):
+    return [stream[idx:idx + size] for idx in range(0, len(stream), size)]
+
+
+def run_stage(name, func, samples, repeat=3):
+    """Best of repeat timings of func(), plus the peak traced allocation of one extra run."""
+    best_wall = best_cpu = float('inf')
+    for idx in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<22} {samples / best_wall:>14,.0f} samples/s {best_cpu * 1000:>10.1f} ms cpu {peak / 1024:>10.0f} KiB peak")
+
+
+def stage_benchmarks(samples, layout):
+    chunks = synthetic_session(samples, layout=layout)
+    stream = b''.join(data for t, data in chunks)
+    reads = _chunked(stream)
+
+    def make_framer():
+        return BinaryFramer(layout) if layout is not None else LineFramer()
+
+    records = []
+    framer = make_framer()
+    for data in reads:
+        records.extend(framer.feed(data))
+    decode = layout.decode if layout is not None else parse_text_records
+    # batches of roughly what one 4 KiB read frames
+    per_batch = max(1, len(records) // len(reads))
+    batches = [records[idx:idx + per_batch] for idx in range(0, len(records), per_batch)]
+    decoded = [decode(batch)[0] for batch in batches]
+    now = time.time()
+
+    def framing():
+        feed = make_framer().feed
+        for data in reads:
+            feed(data)
+
+    def decoding():
+        for batch in batches:
+            decode(batch)
+
+    def store_extend():
+        store = TelemetryStore(capacity=60000)
+        for rows in decoded:
+            store.extend(np.full(len(rows), now), rows)
+
+    def store_append():
+        store = TelemetryStore(capacity=60000)
+        for rows in decoded[:max(1, len(decoded) // 10)]:
+            for row in rows:
+                store.append(now, row)
+
+    def console(mode):
+        def run():
+            for record in records:
+                try:
+                    format_payload(record, mode)
+                except UnicodeDecodeError:
+                    pass
+        return run
+
+    def recording(fmt):
+        def run():
+            with tempfile.TemporaryDirectory() as directory:
+                recorder = Recorder(directory, fmt=fmt, raw_log=False, decode=decode)
+                for batch in batches:
+                    recorder.write_batch(Batch(now, batch))
+                recorder.finalize()
+        return run
+
+    print(f"--- stages, {len(records)} {'binary' if layout is not None else 'text'} samples ---")
+    run_stage("framing", framing, len(records))
+    run_stage("decode", decoding, len(records))
+    run_stage("store extend", store_extend, len(records))
+    run_stage("store append", store_append, sum(len(rows) for rows in decoded[:max(1, len(decoded) // 10)]))
+    for mode in ("Utf8", "Hex", "Dec", "Binary"):
+        run_stage(f"console {mode}", console(mode), len(records))
+    for fmt in ("csv", "npy"):
+        run_stage(f"record {fmt}", recording(fmt), len(records))
+    render_benchmark(decoded, now)
+
+
+def render_benchmark(decoded, now, frames=200, window=3000):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from plot_renderer import PlotRenderer
+
+    store = TelemetryStore(capacity=60000)
+    fig = Figure()
+    renderer = PlotRenderer(None, FigureCanvasAgg(fig), fig.add_subplot(111), store, window=window)
+    full_draws = []
+    renderer.canvas.mpl_connect('draw_event', lambda event: full_draws.append(1))
+    rows = np.concatenate(decoded)
+    per_frame = max(1, len(rows) // frames)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for frame in range(frames):
+        block = rows[frame * per_frame:(frame + 1) * per_frame]
+        if not len(block):
+            break
+        store.extend(now + (frame * per_frame + np.arange(len(block))) * 0.01, block)
+        renderer.render()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{'render':<22} {renderer.frames / wall:>14,.1f} frames/s {cpu * 1000:>10.1f} ms cpu {len(full_draws):>10} full draws")
+
+
+def end_to_end_benchmark(samples, layout, rate, speed, use_pty, render):
+    chunks = synthetic_session(samples, rate=rate, layout=layout)
+    cpu = time.process_time()
+    pipeline, pacer, elapsed = replay(chunks, speed=speed, layout=layout, use_pty=use_pty, render=render)
+    cpu = time.process_time() - cpu
+    received = pipeline.stages["decode"].samples
+    print(f"--- end to end, {'pty' if use_pty else 'in-process port'}, speed {speed or 'max'} ---")
+    print(f"{received} of {samples} samples in {elapsed:.2f} s: {received / elapsed:,.0f} samples/s, "
+          f"cpu {cpu:.2f} s ({100 * cpu / elapsed:.0f}% of one core), {pipeline.garbled} garbled")
+    for stats in pipeline.stages.values():
+        print(stats.report())
+    print("latency " + "  ".join(f"p{pct}={value:.2f} ms" for pct, value in latency_percentiles(pipeline.latencies).items()))
+    if resource is not None:
+        print(f"peak rss {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MTQ tester data path headlessly.")
+    parser.add_argument("--samples", type=int, default=100000, help="samples in the synthetic session")
+    parser.add_argument("--rate", type=float, default=100.0, help="sample rate of the synthetic session in Hz")
+    parser.add_argument("--speed", type=float, default=0, help="end-to-end replay speed, 0 = as fast as possible")
+    parser.add_argument("--binary", action="store_true", help="use binary telemetry frames instead of text lines")
+    parser.add_argument("--pty", action="store_true", help="run the end-to-end benchmark over a virtual serial port")
+    parser.add_argument("--no-render", action="store_true", help="skip plot rendering in the end-to-end run")
+    parser.add_argument("--stages-only", action="store_true")
+    parser.add_argument("--end-to-end-only", action="store_true")
+    args = parser.parse_args()
+
+    layout = FrameLayout() if args.binary else None
+    if not args.end_to_end_only:
+        stage_benchmarks(args.samples, layout)
+    if not args.stages_only:
+        end_to_end_benchmark(args.samples, layout, args.rate, args.speed, args.pty, not args.no_render)
+
+
+if __name__ == "__main__":
+    main()
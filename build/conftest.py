@@ -0,0 +1,16 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def wait_for():
+    """Polls condition() until it is true or timeout seconds pass; returns whether it came true."""
+    def wait(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    return wait
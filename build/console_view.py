@@ -0,0 +1,140 @@
+import time
+from collections import deque
+
+# per-byte text for the Dec/Binary views, looked up in bulk instead of formatted per byte
+_DEC = [f'{b:03}' for b in range(256)]
+_BIN = [f'{b:08b}' for b in range(256)]
+
+
+def format_payload(data, mode):
+    # raises UnicodeDecodeError for Utf8 data that is not valid text
+    if mode == "Utf8":
+        return data.decode('utf-8')
+    if mode == "Hex":
+        return data.hex(' ').replace(' ', '  ') + '\n'
+    if mode == "Dec":
+        return '  '.join(map(_DEC.__getitem__, data)) + '\n'
+    return '  '.join(map(_BIN.__getitem__, data)) + '\n'
+
+
+class ConsoleView:
+    """Buffers console messages and writes them to a CTkTextbox in batches.
+
+    append()/extend() may be called from any thread; they only push onto
+    deques. flush() runs on the Tk main loop every flush_ms, formats what is
+    pending with the selected view mode and inserts it with a single Text
+    insert call. The widget keeps at most max_lines lines, older messages stay
+    in an in-memory ring of history entries so a mode change can re-render
+    them. Without a textbox (headless replay) flush() only formats.
+    """
+
+    def __init__(self, textbox, max_lines=2000, history=20000, flush_ms=100, mode="Utf8", feed=None, stats=None):
+        self.textbox = textbox
+        # CTkTextbox.insert only takes one text/tag pair, the wrapped tk Text takes many
+        self._text = getattr(textbox, '_textbox', textbox)
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self.mode = mode
+        self.feed = feed
+        self.stats = stats
+        self.autoscroll = True
+        self.decode_errors = 0
+        self.history = deque(maxlen=history)
+        # nothing older than max_lines would survive the trim, so pending is capped the same way
+        self._pending = deque(maxlen=max_lines)
+        self._lines = 0
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.textbox.after(self.flush_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.textbox.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        try:
+            if self.feed is not None:
+                self.feed()
+            self.flush()
+        finally:
+            self._after_id = self.textbox.after(self.flush_ms, self._tick)
+
+    def append(self, data, msg_type, timestamp=None):
+        message = (self._format_time(timestamp), bytes(data), msg_type)
+        self.history.append(message)
+        self._pending.append(message)
+
+    def extend(self, records, msg_type, timestamp=None, terminator=b'\n'):
+        # one timestamp string for a whole batch of records
+        stamp = self._format_time(timestamp)
+        messages = [(stamp, record + terminator, msg_type) for record in records]
+        self.history.extend(messages)
+        self._pending.extend(messages)
+
+    def _format_time(self, timestamp):
+        return time.strftime("%H:%M:%S,", time.localtime(timestamp)) + ' '
+
+    def _render(self, messages):
+        # flattened text/tag pairs for one tkinter Text.insert call
+        chunks = []
+        mode = self.mode
+        for stamp, data, msg_type in messages:
+            chunks.append(stamp)
+            chunks.append('timestamp')
+            try:
+                chunks.append(format_payload(data, mode))
+                chunks.append(msg_type)
+            except UnicodeDecodeError:
+                self.decode_errors += 1
+                chunks.append("Message decoding error\n")
+                chunks.append('error')
+        return chunks
+
+    def extend_batches(self, batches, msg_type, terminator=b'\n'):
+        for batch in batches:
+            self.extend(batch.records, msg_type, batch.time, terminator=terminator)
+
+    def _insert(self, messages):
+        if not messages:
+            return
+        chunks = self._render(messages)
+        if self._text is None:
+            return
+        self._text.insert('end', *chunks)
+        self._lines = int(self._text.index('end-1c').split('.')[0])
+        if self._lines > self.max_lines:
+            excess = self._lines - self.max_lines
+            self._text.delete('1.0', f'{excess + 1}.0')
+            self._lines -= excess
+        if self.autoscroll:
+            self._text.yview('end')
+
+    def flush(self):
+        if not self._pending:
+            return
+        started = time.perf_counter()
+        pending = self._pending
+        self._insert([pending.popleft() for idx in range(len(pending))])
+        if self.stats is not None:
+            self.stats.record("console", time.perf_counter() - started)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.rerender()
+
+    def rerender(self):
+        self._pending.clear()
+        if self._text is not None:
+            self._text.delete('1.0', 'end')
+        self._lines = 0
+        self._insert(list(self.history)[-self.max_lines:])
+
+    def clear(self):
+        self.history.clear()
+        self._pending.clear()
+        if self._text is not None:
+            self._text.delete('1.0', 'end')
+        self._lines = 0
@@ -0,0 +1,176 @@
+import numpy as np
+
+from telemetry_store import DEFAULT_CHANNELS
+
+CHECKSUMS = (None, "sum8", "xor8")
+
+
+class FrameLayout:
+    """Declared layout of one fixed size binary telemetry frame.
+
+    header + register id + fixed width fields + optional checksum byte +
+    terminator, mirroring what encode_command sends on the TX side. fields is
+    a sequence of (name, numpy dtype) pairs; the checksum covers the register
+    and field bytes. The whole frame maps onto one packed numpy dtype, so a
+    batch of frames decodes with a single np.frombuffer call.
+    """
+
+    def __init__(self, header=b'#T', register=b'\x20', fields=None, checksum="sum8", terminator=b'\n'):
+        if checksum not in CHECKSUMS:
+            raise ValueError(f"Unknown checksum: {checksum}")
+        if fields is None:
+            fields = [(name, '<f4') for name in DEFAULT_CHANNELS]
+        self.header = bytes(header)
+        self.register = bytes(register)
+        self.fields = [(name, np.dtype(dtype)) for name, dtype in fields]
+        self.checksum = checksum
+        self.terminator = bytes(terminator)
+        self.sync = self.header + self.register
+
+        layout = [('sync', f'S{len(self.sync)}')] + self.fields
+        if checksum is not None:
+            layout.append(('checksum', 'u1'))
+        if self.terminator:
+            layout.append(('terminator', f'S{len(self.terminator)}'))
+        self.dtype = np.dtype(layout)
+        self.size = self.dtype.itemsize
+        self.channels = [name for name, dtype in self.fields]
+        # byte ranges inside a frame used by the vectorized checks
+        self._checked = slice(len(self.header), len(self.sync) + sum(dtype.itemsize for name, dtype in self.fields))
+        self._checksum_at = self._checked.stop
+
+    def checksums(self, frames):
+        # frames is an (n, size) uint8 array, returns the expected checksum of every row
+        covered = frames[:, self._checked]
+        if self.checksum == "xor8":
+            return np.bitwise_xor.reduce(covered, axis=1)
+        return (covered.sum(axis=1) & 0xFF).astype(np.uint8)
+
+    def valid(self, frames):
+        ok = np.all(frames[:, :len(self.sync)] == np.frombuffer(self.sync, dtype=np.uint8), axis=1)
+        if self.terminator:
+            ok &= np.all(frames[:, self.size - len(self.terminator):] == np.frombuffer(self.terminator, dtype=np.uint8), axis=1)
+        if self.checksum is not None:
+            ok &= self.checksums(frames) == frames[:, self._checksum_at]
+        return ok
+
+    def valid_frame(self, frame):
+        """Scalar check of one frame (bytes); cheaper than valid() for a single candidate."""
+        if not frame.startswith(self.sync) or not frame.endswith(self.terminator):
+            return False
+        if self.checksum is None:
+            return True
+        covered = frame[self._checked]
+        if self.checksum == "xor8":
+            expected = 0
+            for byte in covered:
+                expected ^= byte
+        else:
+            expected = sum(covered) & 0xFF
+        return expected == frame[self._checksum_at]
+
+    def decode(self, records):
+        """Decodes a batch of frames into an (n, k) float array, same contract as parse_text_records."""
+        garbled = 0
+        if any(len(record) != self.size for record in records):
+            kept = [record for record in records if len(record) == self.size]
+            garbled = len(records) - len(kept)
+            records = kept
+        if not records:
+            return np.empty((0, 0)), garbled
+        frames = np.frombuffer(b''.join(records), dtype=self.dtype)
+        rows = np.empty((len(frames), len(self.channels)))
+        for idx, name in enumerate(self.channels):
+            rows[:, idx] = frames[name]
+        return rows, garbled
+
+    def encode(self, rows):
+        """Builds frames for an (n, k) array of channel values, used by stand-in devices and replay."""
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        frames = np.zeros(len(rows), dtype=self.dtype)
+        frames['sync'] = self.sync
+        for idx, name in enumerate(self.channels):
+            frames[name] = rows[:, idx]
+        if self.terminator:
+            frames['terminator'] = self.terminator
+        if self.checksum is not None:
+            frames['checksum'] = self.checksums(frames.view(np.uint8).reshape(len(rows), self.size))
+        return frames.tobytes()
+
+
+class BinaryFramer:
+    """Cuts a byte stream into FrameLayout frames, resynchronizing after corrupt bytes.
+
+    Runs of frames that follow a sync pattern back to back are validated in
+    vectorized passes; the pass length doubles while the stream is clean. When
+    a frame fails the sync, terminator or checksum check the framer moves one
+    byte past its start and checks the following sync candidates one at a
+    time until a good frame turns up, so a burst of junk costs linear time.
+    skipped_bytes and corrupt_frames count what was thrown away.
+    """
+
+    MIN_RUN = 64   # frames in the first vectorized pass after a resync
+    MAX_RUN = 1 << 16
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.buffer = bytearray()
+        self.skipped_bytes = 0
+        self.corrupt_frames = 0
+        self._run = self.MIN_RUN   # 0 while hunting for sync after a corrupt frame
+
+    def feed(self, data):
+        self.buffer += data
+        buffer = self.buffer
+        layout = self.layout
+        size = layout.size
+        frames = []
+        pos = 0
+        # the view pins the bytearray, it is released before the consumed bytes are deleted
+        view = memoryview(buffer)
+        try:
+            while True:
+                start = buffer.find(layout.sync, pos)
+                if start < 0:
+                    # keep a possible partial sync pattern at the very end
+                    keep = max(pos, len(buffer) - len(layout.sync) + 1)
+                    self.skipped_bytes += keep - pos
+                    pos = keep
+                    break
+                self.skipped_bytes += start - pos
+                pos = start
+                available = (len(buffer) - start) // size
+                if not available:
+                    break
+                if not self._run:
+                    frame = view[start:start + size].tobytes()
+                    if layout.valid_frame(frame):
+                        frames.append(frame)
+                        pos = start + size
+                        self._run = self.MIN_RUN
+                    else:
+                        self.corrupt_frames += 1
+                        self.skipped_bytes += 1
+                        pos = start + 1
+                    continue
+                count = min(available, self._run)
+                ok = layout.valid(np.frombuffer(view, dtype=np.uint8, count=count * size, offset=start).reshape(count, size))
+                good = count if ok.all() else int(ok.argmin())
+                frames.extend(view[offset:offset + size].tobytes() for offset in range(start, start + good * size, size))
+                pos = start + good * size
+                if good == count:
+                    self._run = min(self._run * 2, self.MAX_RUN)
+                    continue
+                # corrupt frame at pos, resync from the next byte
+                self.corrupt_frames += 1
+                self.skipped_bytes += 1
+                pos += 1
+                self._run = 0
+        finally:
+            view.release()
+        del buffer[:pos]
+        return frames
+
+    def reset(self):
+        del self.buffer[:]
+        self._run = self.MIN_RUN
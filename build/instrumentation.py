@@ -0,0 +1,137 @@
+import json
+import time
+
+STAGES = ("queue", "decode", "store", "render", "console")
+
+
+class LatencyHistogram:
+    """Log2 bucketed latency histogram; bucket k holds durations below 2**k microseconds.
+
+    add() is a couple of integer operations, cheap enough to call for every
+    batch and every frame in production.
+    """
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = int(seconds * 1e6).bit_length() if seconds > 0 else 0
+        self.counts[min(bucket, self.BUCKETS - 1)] += 1
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        # upper edge of the bucket holding the pct-th percentile, in seconds
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                # the last bucket also holds everything longer, its edge says nothing about them
+                if bucket == self.BUCKETS - 1:
+                    return self.max
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class PipelineStats:
+    """Counters, queue depths and per-stage latency histograms of the live data path.
+
+    The data path calls record() and bumps the plain integer counters; the
+    ingest engine, its subscriptions, the plot renderer and the console view
+    are attached and read only when snapshot() runs. Each snapshot reports
+    rates and latencies over the interval since the previous one and resets
+    the histograms.
+    """
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.samples = 0
+        self.garbled = 0
+        self.ingest = None
+        self.queues = {}
+        self.renderer = None
+        self.console = None
+        self._last_time = time.monotonic()
+        self._last_counts = (0, 0, 0, 0)
+
+    def attach(self, ingest, queues):
+        self.ingest = ingest
+        self.queues = queues
+        self._last_counts = (0, 0, self.samples, self._last_counts[3])
+
+    def record(self, stage, seconds):
+        self.histograms[stage].add(seconds)
+
+    def snapshot(self):
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        ingest = self.ingest
+        framer = ingest.framer if ingest is not None else None
+        frames = self.renderer.frames if self.renderer is not None else 0
+        counts = (ingest.bytes_in if ingest else 0, ingest.records_in if ingest else 0, self.samples, frames)
+        rates = [(new - old) / elapsed for new, old in zip(counts, self._last_counts)]
+        self._last_time, self._last_counts = now, counts
+
+        snapshot = {
+            "time": time.time(),
+            "bytes_per_s": round(rates[0], 1),
+            "lines_per_s": round(rates[1], 1),
+            "samples_per_s": round(rates[2], 1),
+            "fps": round(rates[3], 1),
+            "bytes_in": counts[0],
+            "bytes_out": ingest.bytes_out if ingest else 0,
+            "queue_depth": {name: queue.qsize() for name, queue in self.queues.items()},
+            "dropped": {name: queue.dropped for name, queue in self.queues.items()},
+            "garbled": self.garbled,
+            "console_decode_errors": self.console.decode_errors if self.console is not None else 0,
+            "skipped_bytes": getattr(framer, "skipped_bytes", 0),
+            "corrupt_frames": getattr(framer, "corrupt_frames", 0),
+            "line_overruns": getattr(framer, "overruns", 0),
+            "latency": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+        }
+        for histogram in self.histograms.values():
+            histogram.reset()
+        return snapshot
+
+
+def format_hud(snapshot):
+    latency = snapshot["latency"]
+    depth = " ".join(f"{name} {value}" for name, value in snapshot["queue_depth"].items())
+    return (f"RX {snapshot['bytes_per_s'] / 1000:.1f} kB/s {snapshot['lines_per_s']:.0f} lines/s | "
+            f"queues {depth} | dropped {sum(snapshot['dropped'].values())} garbled {snapshot['garbled']} "
+            f"resync {snapshot['skipped_bytes']} B | plot {snapshot['fps']:.0f} fps | "
+            f"p99 queue {latency['queue']['p99_ms']:.1f} decode {latency['decode']['p99_ms']:.1f} "
+            f"render {latency['render']['p99_ms']:.1f} console {latency['console']['p99_ms']:.1f} ms")
+
+
+class StatsExporter:
+    """Appends snapshots as JSON lines to a file for post-test analysis."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, mode='a', buffering=1)
+
+    def write(self, snapshot):
+        self.file.write(json.dumps(snapshot) + '\n')
+
+    def close(self):
+        self.file.close()
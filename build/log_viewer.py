@@ -0,0 +1,302 @@
+"""Offline viewer for recorded MTQ sessions.
+
+Loads output.csv style CSV logs in chunks (cached as a sibling .npy for
+memory-mapped reloads) or Recorder .npy files directly via mmap, builds a
+min/max downsample pyramid and only hands the points visible at the current
+zoom to Matplotlib. Per-window mean, RMS and drift of every channel are
+computed vectorized; run this file to export them:
+
+    python log_viewer.py MTQ_20240101_120000.csv --window 1 --out stats.csv
+"""
+import argparse
+import warnings
+from pathlib import Path
+
+import matplotlib.ticker as mticker
+import numpy as np
+
+from telemetry_store import DEFAULT_CHANNELS, parse_text_records
+
+TIME_CHANNEL = "MTQ time"
+
+
+def _clock_seconds(stamps):
+    # vectorized HH:MM:SS[.mmm] -> seconds of day for an array of byte strings
+    digits = np.array(stamps, dtype='S12').view(np.uint8).reshape(len(stamps), 12).astype(np.int64) - ord('0')
+    seconds = (digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 3] * 10 + digits[:, 4]) * 60 + digits[:, 6] * 10 + digits[:, 7]
+    has_millis = digits[:, 8] == ord('.') - ord('0')
+    millis = np.where(has_millis, digits[:, 9] * 100 + digits[:, 10] * 10 + digits[:, 11], 0)
+    return seconds + millis / 1000.0
+
+
+def _parse_csv(path, chunk_rows):
+    with open(path, 'rb') as f:
+        header = f.readline().decode('ascii', errors='replace').strip().split(',')
+        channels = header[1:] if len(header) > 1 else list(DEFAULT_CHANNELS)
+        blocks = []
+        while True:
+            lines = f.readlines(chunk_rows * 48)
+            if not lines:
+                break
+            stamps, payloads = [], []
+            for line in lines:
+                stamp, sep, payload = line.partition(b',')
+                # console dumps and other rows that do not match the header are dropped with their timestamps
+                if payload.count(b',') == len(channels) - 1:
+                    stamps.append(stamp.strip())
+                    payloads.append(payload)
+            rows, garbled = parse_text_records(payloads)
+            if garbled:
+                keep = [idx for idx, payload in enumerate(payloads) if not parse_text_records([payload])[1]]
+                stamps = [stamps[idx] for idx in keep]
+                rows, garbled = parse_text_records([payloads[idx] for idx in keep])
+            if len(rows):
+                blocks.append(np.column_stack([_clock_seconds(stamps), rows]))
+    if not blocks:
+        return np.empty((0, len(channels) + 1)), channels
+    return np.concatenate(blocks), channels
+
+
+def _time_axis(data, channels):
+    # the device clock (MTQ time) spaces samples evenly at sub-second resolution; the first column is
+    # the fallback: time of day in CSV logs, batch arrival time (shared by a whole batch) in .npy recordings
+    if TIME_CHANNEL in channels:
+        device = data[:, channels.index(TIME_CHANNEL) + 1]
+        if len(device) > 1 and device[-1] > device[0] and np.all(np.diff(device) >= 0):
+            return device
+    return data[:, 0]
+
+
+class SessionLog:
+    """Samples of one recorded session: times (seconds) and an (n, k) value array, possibly memory mapped."""
+
+    def __init__(self, path, times, values, channels):
+        self.path = Path(path)
+        self.times = times
+        self.values = values
+        self.channels = list(channels)
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def load(cls, path, chunk_rows=200000):
+        """Opens a .npy recording (memory mapped) or a CSV log (parsed in chunks, cached as .npy)."""
+        path = Path(path)
+        if path.suffix == '.npy':
+            data = np.load(path, mmap_mode='r')
+            channels = list(DEFAULT_CHANNELS)
+            channels += [f"Value {idx + 1}" for idx in range(len(channels), data.shape[1] - 1)]
+            channels = channels[:data.shape[1] - 1]
+            return cls(path, _time_axis(data, channels), data[:, 1:], channels)
+
+        cache = path.with_name(path.stem + '.cache.npy')
+        header_cache = path.with_name(path.stem + '.cache.txt')
+        if cache.exists() and header_cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+            data = np.load(cache, mmap_mode='r')
+            channels = header_cache.read_text().split(',')
+        else:
+            data, channels = _parse_csv(path, chunk_rows)
+            try:
+                np.save(cache, data)
+                header_cache.write_text(','.join(channels))
+                data = np.load(cache, mmap_mode='r')
+            except OSError:
+                pass  # read-only location, keep the parsed array in memory
+        return cls(path, _time_axis(data, channels), data[:, 1:], channels)
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max summary of every channel.
+
+    Level 0 is the raw data. Each higher level merges factor buckets of the
+    one below, keeping the min and max of every channel plus the time of the
+    bucket's first sample. visible() picks the coarsest level that still
+    gives about two points per pixel in the requested time range and returns
+    the min/max envelope, so spikes survive any zoom level.
+    """
+
+    def __init__(self, times, values, factor=4, min_buckets=1024):
+        self.times = times
+        self.values = values
+        self.factor = factor
+        self.levels = []   # (bucket size, bucket start times, mins, maxs)
+        size = factor
+        mins, maxs = values, values
+        bucket_times = times
+        while len(bucket_times) // factor >= min_buckets:
+            count = len(bucket_times) // factor
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)   # all-NaN buckets stay NaN
+                mins = np.nanmin(np.asarray(mins[:count * factor]).reshape(count, factor, -1), axis=1)
+                maxs = np.nanmax(np.asarray(maxs[:count * factor]).reshape(count, factor, -1), axis=1)
+            bucket_times = np.asarray(bucket_times[:count * factor:factor])
+            self.levels.append((size, bucket_times, mins, maxs))
+            size *= factor
+
+    def visible(self, t_start, t_end, pixels, channel):
+        """(x, y) of one channel between t_start and t_end, 2 to 2 * factor points per pixel.
+
+        A range wider than the coarsest level allows gets that level's buckets.
+        """
+        start, end = np.searchsorted(self.times, (t_start, t_end))
+        start, end = max(start - 1, 0), min(end + 1, len(self.times))
+        if end - start <= 2 * pixels or not self.levels:
+            return self.times[start:end], self.values[start:end, channel]
+        chosen = self.levels[0]
+        for level in self.levels:
+            if (end - start) // level[0] < pixels:
+                break
+            chosen = level
+        size, bucket_times, mins, maxs = chosen
+        lo, hi = start // size, min(-(-end // size), len(bucket_times))
+        x = np.repeat(bucket_times[lo:hi], 2)
+        y = np.empty(len(x))
+        y[0::2] = mins[lo:hi, channel]
+        y[1::2] = maxs[lo:hi, channel]
+        return x, y
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of (x, y) to threshold points."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.asarray(x), np.asarray(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for idx in range(threshold - 2):
+        lo, hi = edges[idx], edges[idx + 1]
+        # average of the next bucket is the third corner of the triangle
+        next_lo, next_hi = hi, edges[idx + 2] if idx + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous]) - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        selected[idx + 1] = previous
+    return x[selected], y[selected]
+
+
+def window_stats(times, values, window):
+    """Mean, RMS and linear drift (units/s) of every channel over consecutive windows of window seconds.
+
+    Returns (window start times, means, rms, drift), each statistic an (n_windows, k) array.
+    Windows are cut by sample count using the median sample period.
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(times) < 2:
+        empty = np.empty((0, values.shape[1] if values.ndim == 2 else 0))
+        return np.empty(0), empty, empty, empty
+    period = np.median(np.diff(times))
+    size = max(2, int(round(window / period)) if period > 0 else len(times))
+    count = len(times) // size
+    if not count:
+        size, count = len(times), 1
+    t = times[:count * size].reshape(count, size)
+    v = values[:count * size].reshape(count, size, -1)
+    means = np.nanmean(v, axis=1)
+    rms = np.sqrt(np.nanmean(v * v, axis=1))
+    dt = t - t.mean(axis=1, keepdims=True)
+    denominator = np.sum(dt * dt, axis=1)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drift = np.nansum(dt[:, :, None] * (v - means[:, None, :]), axis=1) / denominator
+    return t[:, 0], means, rms, drift
+
+
+class LogViewer:
+    """Shows a SessionLog on a Matplotlib axes, drawing only the points visible at the current zoom.
+
+    Hooks the axes' xlim_changed callback, so the toolbar's zoom and pan (or
+    set_xlim) pull the matching pyramid level. With method="lttb" a visible
+    range of up to LTTB_LIMIT raw samples is reduced with LTTB instead of the
+    min/max envelope. on_view(t_start, t_end) is called after every change.
+    """
+
+    LTTB_LIMIT = 200000
+
+    def __init__(self, ax, log, method="minmax", on_view=None):
+        self.ax = ax
+        self.log = log
+        self.method = method
+        self.on_view = on_view
+        self.pyramid = MinMaxPyramid(log.times, log.values)
+        # MTQ time is the x axis of most logs, the remaining channels are plotted
+        self.channels = [idx for idx, name in enumerate(log.channels) if name != TIME_CHANNEL]
+        self.lines = {}
+        for idx in self.channels:
+            self.lines[idx], = ax.plot([], [], label=log.channels[idx], linewidth=0.8)
+        ax.legend(loc='upper left')
+        start = float(log.times[0]) if len(log) else 0.0
+        ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, pos: f"{x - start:.1f} s"))
+        self._callback = ax.callbacks.connect('xlim_changed', self._on_xlim)
+        if len(log):
+            self._set_ylim()
+            ax.set_xlim(log.times[0], log.times[-1])
+
+    def _set_ylim(self):
+        level = self.pyramid.levels[-1] if self.pyramid.levels else (1, None, self.log.values, self.log.values)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            low = np.nanmin(np.asarray(level[2])[:, self.channels])
+            high = np.nanmax(np.asarray(level[3])[:, self.channels])
+        if np.isfinite(low) and np.isfinite(high):
+            span = max(high - low, 1e-6)
+            self.ax.set_ylim(low - 0.05 * span, high + 0.05 * span)
+
+    def disconnect(self):
+        self.ax.callbacks.disconnect(self._callback)
+
+    def _on_xlim(self, ax):
+        self.refresh()
+
+    def refresh(self):
+        t_start, t_end = self.ax.get_xlim()
+        pixels = max(100, int(self.ax.bbox.width))
+        start, end = np.searchsorted(self.log.times, t_start), np.searchsorted(self.log.times, t_end, 'right')
+        use_lttb = self.method == "lttb" and end - start <= self.LTTB_LIMIT
+        for idx, line in self.lines.items():
+            if use_lttb:
+                x, y = lttb(self.log.times[start:end], self.log.values[start:end, idx], 2 * pixels)
+            else:
+                x, y = self.pyramid.visible(t_start, t_end, pixels, idx)
+            line.set_data(x, y)
+        if self.on_view is not None:
+            self.on_view(t_start, t_end)
+
+    def visible_summary(self, t_start, t_end):
+        """Mean, RMS and drift of every plotted channel between t_start and t_end, as one line of text."""
+        start, end = np.searchsorted(self.log.times, t_start), np.searchsorted(self.log.times, t_end, 'right')
+        if end - start < 2:
+            return "No samples in view"
+        times, means, rms, drift = window_stats(self.log.times[start:end], self.log.values[start:end][:, self.channels], t_end - t_start + 1)
+        parts = [f"{self.log.channels[idx]} mean {means[0, col]:.3f} rms {rms[0, col]:.3f} drift {drift[0, col]:.4f}/s"
+                 for col, idx in enumerate(self.channels)]
+        return f"{end - start} samples | " + " | ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-window statistics of a recorded MTQ session.")
+    parser.add_argument("path", help="output.csv style CSV or Recorder .npy log")
+    parser.add_argument("--window", type=float, default=1.0, help="window length in seconds")
+    parser.add_argument("--out", help="write the statistics to this CSV instead of stdout")
+    args = parser.parse_args()
+
+    log = SessionLog.load(args.path)
+    starts, means, rms, drift = window_stats(log.times, log.values, args.window)
+    names = log.channels
+    header = "window start," + ",".join(f"{name} {stat}" for stat in ("mean", "rms", "drift") for name in names)
+    table = np.column_stack([starts, means, rms, drift])
+    if args.out:
+        np.savetxt(args.out, table, fmt='%.6f', delimiter=',', header=header, comments='')
+        print(f"{len(log)} samples, {len(starts)} windows written to {args.out}")
+    else:
+        print(header)
+        for row in table:
+            print(",".join(f"{value:.6f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import time
+
+import matplotlib.ticker as mticker
+import numpy as np
+
+
+def format_time_tick(x, pos=None):
+    # x values are epoch seconds from the telemetry store
+    return time.strftime('%M:%S', time.localtime(x))
+
+
+class PlotRenderer:
+    """Draws the newest samples of a TelemetryStore at a capped frame rate.
+
+    Runs on the Tk main loop through widget.after(). Each frame first calls
+    feed() so everything that arrived since the last frame is merged into the
+    store, then redraws only the line artists over a cached background
+    (blitting). A full canvas draw only happens when the data leaves the
+    current axis limits, the line set changes or a line is toggled; the
+    limits are padded so that happens every few seconds rather than every
+    frame.
+    """
+
+    X_LOOKAHEAD = 0.2   # fraction of the visible span kept free to the right
+    Y_MARGIN = 0.1
+
+    def __init__(self, widget, canvas, ax, store, window=3000, fps=30, feed=None, stats=None):
+        self.widget = widget
+        self.canvas = canvas
+        self.ax = ax
+        self.store = store
+        self.window = window
+        self.fps = fps
+        self.feed = feed
+        self.stats = stats
+        self.lines = {}
+        self.frames = 0
+        self.paused = False   # keeps feeding the store but skips drawing, e.g. while a log is shown
+        self._legend = None
+        self._background = None
+        self._drawn_version = None
+        self._after_id = None
+        self.ax.xaxis.set_major_formatter(mticker.FuncFormatter(format_time_tick))
+        # connected once, the draw event fires for every full redraw including resizes and theme changes
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('pick_event', self._on_pick)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(0, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        started = time.perf_counter()
+        try:
+            if self.feed is not None:
+                self.feed()
+            if not self.paused:
+                self.render()
+        finally:
+            period_ms = 1000.0 / self.fps
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._after_id = self.widget.after(max(1, int(period_ms - elapsed_ms)), self._tick)
+
+    def reset(self):
+        for line in self.lines.values():
+            line.remove()
+        self.lines = {}
+        if self._legend is not None:
+            self._legend.remove()
+            self._legend = None
+        self.store.clear()
+        self._drawn_version = None
+        self.canvas.draw_idle()
+
+    def _ensure_lines(self):
+        if len(self.lines) == len(self.store.channels):
+            return False
+        for label in self.store.channels[len(self.lines):]:
+            line, = self.ax.plot([], [], label=label, animated=True)
+            self.lines[label] = line
+        if self._legend is not None:
+            self._legend.remove()
+        self._legend = self.ax.legend(loc='upper left')
+        for legend_line in self._legend.get_lines():
+            legend_line.set_picker(True)
+        return True
+
+    def _update_limits(self, timestamps):
+        # returns True when the axis limits had to move, which needs a full redraw
+        visible = [idx for idx, line in enumerate(self.lines.values()) if line.get_visible()]
+        y_min, y_max = self.store.minmax(visible, self.window) if visible else (np.nan, np.nan)
+        if not len(timestamps) or not np.isfinite(y_min):
+            return False
+        changed = False
+
+        t_min, t_max = timestamps[0], timestamps[-1]
+        x_low, x_high = self.ax.get_xlim()
+        if t_max > x_high or t_min < x_low:
+            span = max(t_max - t_min, 1.0)
+            self.ax.set_xlim(t_min, t_max + span * self.X_LOOKAHEAD)
+            changed = True
+
+        y_low, y_high = self.ax.get_ylim()
+        y_span = max(y_max - y_min, 1e-6)
+        # grow as soon as data leaves the axis, shrink once the axis is mostly empty
+        if y_min < y_low or y_max > y_high or (y_high - y_low) > 4 * (y_span * (1 + 2 * self.Y_MARGIN)):
+            self.ax.set_ylim(y_min - y_span * self.Y_MARGIN, y_max + y_span * self.Y_MARGIN)
+            changed = True
+        return changed
+
+    def render(self, force=False):
+        if self.store.version == self._drawn_version and not force:
+            return
+        self._drawn_version = self.store.version
+        started = time.perf_counter()
+        new_lines = self._ensure_lines()
+        timestamps, data = self.store.window(self.window)
+        for idx, line in enumerate(self.lines.values()):
+            line.set_data(timestamps, data[idx])
+        limits_moved = self._update_limits(timestamps)
+        if new_lines or force or limits_moved or self._background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.ax.bbox)
+        self.frames += 1
+        if self.stats is not None:
+            self.stats.record("render", time.perf_counter() - started)
+
+    def _draw_lines(self):
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+    def _on_draw(self, event):
+        if not self.ax.get_visible():
+            return
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    def _on_pick(self, event):
+        legend_line = event.artist
+        line = self.lines.get(legend_line.get_label())
+        if line is None:
+            return
+        visible = not line.get_visible()
+        line.set_visible(visible)
+        legend_line.set_alpha(1.0 if visible else 0.6)
+        self._update_limits(self.store.window(self.window)[0])
+        self.canvas.draw_idle()
@@ -0,0 +1,260 @@
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from telemetry_store import DEFAULT_CHANNELS, parse_text_records
+
+# raw capture record: direction (b'R' received, b'T' sent), epoch time, payload length, then the payload
+RAW_RECORD = struct.Struct('<cdI')
+RAW_DIRECTIONS = {"rx": b'R', "tx": b'T'}
+
+NPY_HEADER_LEN = 128
+
+
+def format_timestamp(timestamp):
+    return time.strftime('%H:%M:%S', time.localtime(timestamp)) + f'.{int(timestamp * 1000) % 1000:03d}'
+
+
+class CsvSampleWriter:
+    """Appends samples in the output.csv layout: Timestamp, MTQ time, Gyro X, Gyro Y, Gyro Z."""
+
+    extension = '.csv'
+
+    def __init__(self, path, channels):
+        self.path = path
+        self.rows = 0
+        self.columns = len(channels)
+        self.file = open(path, mode='x', newline='', buffering=1 << 16)
+        self.file.write(','.join(['Timestamp'] + list(channels)) + '\n')
+
+    def write(self, timestamp, rows):
+        if rows.shape[1] != self.columns:
+            # every row matches the header, missing values are written as nan
+            block = np.full((len(rows), self.columns), np.nan)
+            width = min(rows.shape[1], self.columns)
+            block[:, :width] = rows[:, :width]
+            rows = block
+        stamp = format_timestamp(timestamp)
+        # one format string for the whole batch, the shared timestamp is baked into it
+        fmt = stamp + ', ' + ', '.join(['%f'] * self.columns)
+        np.savetxt(self.file, rows, fmt=fmt)
+        self.rows += len(rows)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class NpySampleWriter:
+    """Appends float64 rows of (epoch time, channels...) to a .npy file.
+
+    The header is written with room to spare and rewritten with the real row
+    count on every flush, so the file is a valid array (np.load(path,
+    mmap_mode='r')) even if the app dies mid-session.
+    """
+
+    extension = '.npy'
+
+    def __init__(self, path, channels):
+        self.path = path
+        self.rows = 0
+        self.columns = len(channels) + 1
+        self.file = open(path, mode='xb', buffering=1 << 16)
+        self._write_header()
+
+    def _write_header(self):
+        header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }" % (self.rows, self.columns)
+        header = header.ljust(NPY_HEADER_LEN - 11) + '\n'
+        self.file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+
+    def write(self, timestamp, rows):
+        block = np.full((len(rows), self.columns), np.nan)
+        block[:, 0] = timestamp
+        width = min(rows.shape[1], self.columns - 1)
+        block[:, 1:width + 1] = rows[:, :width]
+        self.file.write(block.astype('<f8', copy=False).tobytes())
+        self.rows += len(rows)
+
+    def flush(self):
+        end = self.file.tell()
+        self.file.seek(0)
+        self._write_header()
+        self.file.seek(end)
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+SAMPLE_WRITERS = {"csv": CsvSampleWriter, "npy": NpySampleWriter}
+
+
+class Recorder:
+    """Streams parsed samples from a SerialIngest to disk on a background thread.
+
+    Files are named <prefix>_<start time>[_NNN]<ext> in directory, the start
+    time down to the millisecond; a new part is started every rotate_rows
+    samples when rotate_rows is set. Existing files are never overwritten, a
+    taken name gets a -N counter after the start time instead. With
+    raw_log, every chunk read from or written to the port also goes to
+    <prefix>_<start time>_raw.bin as RAW_RECORD headed records. Writes are
+    buffered and flushed every flush_interval seconds; finalize() drains what
+    is left, closes the files and returns their paths.
+    """
+
+    def __init__(self, directory, fmt="csv", prefix="MTQ", rotate_rows=None, raw_log=True,
+                 flush_interval=1.0, channels=DEFAULT_CHANNELS, decode=parse_text_records):
+        if fmt not in SAMPLE_WRITERS:
+            raise ValueError(f"Unknown recording format: {fmt}")
+        self.directory = Path(directory)
+        self.fmt = fmt
+        self.rotate_rows = rotate_rows
+        self.raw_log = raw_log
+        self.flush_interval = flush_interval
+        self.channels = list(channels)
+        self.decode = decode
+        self._stamp = f"{prefix}_{datetime.now():%Y%m%d_%H%M%S_%f}"[:-3]
+        self._collisions = 0
+        self.base_name = self._stamp
+        self.paths = []
+        self.rows = 0
+        self.garbled = 0
+        self.error = None
+        self.ingest = None
+        self.samples = None
+        self._writer = None
+        self._part = 0
+        self._raw = deque()
+        self._raw_file = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def attach(self, ingest):
+        self.ingest = ingest
+        # large enough to ride out a slow disk, the recorder should never be the consumer that drops
+        self.samples = ingest.subscribe(maxsize=65536, overflow="drop_oldest")
+        if self.raw_log:
+            ingest.add_raw_listener(self._on_raw)
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.raw_log:
+            self._raw_file, raw_path = self._create("_raw.bin", lambda path: open(path, mode='xb', buffering=1 << 16))
+            self.paths.append(raw_path)
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def _on_raw(self, direction, timestamp, data):
+        self._raw.append((RAW_DIRECTIONS[direction], timestamp, data))
+
+    def _create(self, tail, opener):
+        # files are opened exclusively, a name already taken (e.g. a second session started
+        # within the same millisecond) bumps the counter in base_name until one is free
+        while True:
+            path = self.directory / f"{self.base_name}{tail}"
+            try:
+                return opener(path), path
+            except FileExistsError:
+                self._collisions += 1
+                self.base_name = f"{self._stamp}-{self._collisions}"
+
+    def _open_part(self):
+        suffix = f"_{self._part:03d}" if self.rotate_rows else ""
+        writer_class = SAMPLE_WRITERS[self.fmt]
+        self._writer, path = self._create(suffix + writer_class.extension, lambda path: writer_class(path, self.channels))
+        self.paths.append(path)
+        self._part += 1
+
+    def write_batch(self, batch):
+        rows, garbled = self.decode(batch.records)
+        self.garbled += garbled
+        while len(rows):
+            if self._writer is None:
+                self._open_part()
+            count = len(rows)
+            if self.rotate_rows:
+                count = min(count, self.rotate_rows - self._writer.rows)
+            self._writer.write(batch.time, rows[:count])
+            self.rows += count
+            rows = rows[count:]
+            if self.rotate_rows and self._writer.rows >= self.rotate_rows:
+                self._writer.close()
+                self._writer = None
+
+    def _write_raw(self):
+        raw = self._raw
+        for idx in range(len(raw)):
+            direction, timestamp, data = raw.popleft()
+            self._raw_file.write(RAW_RECORD.pack(direction, timestamp, len(data)))
+            self._raw_file.write(data)
+
+    def _flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+        if self._raw_file is not None:
+            self._raw_file.flush()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        try:
+            while not self._stop_event.is_set():
+                batch = self.samples.get(timeout=self.flush_interval)
+                if batch is not None:
+                    self.write_batch(batch)
+                if self._raw_file is not None:
+                    self._write_raw()
+                if time.monotonic() >= next_flush:
+                    self._flush()
+                    next_flush = time.monotonic() + self.flush_interval
+            for batch in self.samples.drain():
+                self.write_batch(batch)
+            if self._raw_file is not None:
+                self._write_raw()
+        except (OSError, ValueError) as e:
+            self.error = e
+            # nothing drains the raw capture any more, stop collecting it
+            self._detach()
+            self._raw.clear()
+
+    def _detach(self):
+        if self.ingest is not None:
+            self.ingest.unsubscribe(self.samples)
+            self.ingest.remove_raw_listener(self._on_raw)
+
+    def finalize(self):
+        """Stops recording and closes the files; errors end up in error rather than being raised."""
+        self._detach()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        for name in ("_writer", "_raw_file"):
+            target = getattr(self, name)
+            if target is None:
+                continue
+            setattr(self, name, None)
+            try:
+                target.close()
+            except (OSError, ValueError) as e:
+                if self.error is None:
+                    self.error = e
+        return self.paths
+
+
+def read_raw_log(path):
+    """Yields (direction, time, data) tuples from a raw capture written by Recorder."""
+    directions = {value: key for key, value in RAW_DIRECTIONS.items()}
+    with open(path, 'rb') as f:
+        while True:
+            head = f.read(RAW_RECORD.size)
+            if len(head) < RAW_RECORD.size:
+                return
+            direction, timestamp, length = RAW_RECORD.unpack(head)
+            yield directions[direction], timestamp, f.read(length)
@@ -0,0 +1,359 @@
+"""Headless replay of captured MTQ sessions through the live data path.
+
+Feeds a recorded session (output.csv layout, Recorder .npy or _raw.bin
+capture) into SerialIngest and runs the same decode -> TelemetryStore ->
+PlotRenderer / console formatting / Recorder stages the GUI uses, without a
+display. The stream is paced at --speed times real time (0 = as fast as
+possible) through an in-process port or, with --pty, a virtual serial port.
+
+    python replay.py output.csv --speed 10
+    python replay.py MTQ_20240101_120000_raw.bin --speed 0 --pty --record out/
+"""
+import argparse
+import bisect
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import serial
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from console_view import ConsoleView
+from frame_codec import BinaryFramer, FrameLayout
+from plot_renderer import PlotRenderer
+from recorder import Recorder, read_raw_log
+from serial_ingest import LineFramer, SerialIngest
+from telemetry_store import TelemetryStore, feed_store, parse_text_records
+
+
+def _parse_clock(text):
+    # output.csv timestamps are time of day only, HH:MM:SS or HH:MM:SS.mmm
+    fmt = '%H:%M:%S.%f' if '.' in text else '%H:%M:%S'
+    stamp = datetime.strptime(text.strip(), fmt)
+    return stamp.hour * 3600 + stamp.minute * 60 + stamp.second + stamp.microsecond / 1e6
+
+
+def load_session(path, layout=None):
+    """Returns the received stream of a capture as a list of (time, bytes) chunks.
+
+    CSV rows are replayed as the device text lines; their pacing follows the
+    MTQ time column (device clock) when it increases, since the Timestamp
+    column of older captures only has one second resolution. .npy rows are
+    sent as text, or as binary frames when a FrameLayout is given.
+    """
+    path = Path(path)
+    if path.suffix == '.bin':
+        return [(timestamp, data) for direction, timestamp, data in read_raw_log(path) if direction == "rx"]
+    if path.suffix == '.npy':
+        rows = np.load(path, mmap_mode='r')
+        return _rows_to_chunks(rows[:, 0], rows[:, 1:], layout)
+    chunks = []
+    clock = []
+    device = []
+    with open(path, 'rb') as f:
+        f.readline()  # header
+        for line in f:
+            stamp, sep, payload = line.partition(b',')
+            if not sep or not payload.strip():
+                continue
+            chunks.append(payload.strip() + b'\n')
+            clock.append(_parse_clock(stamp.decode('ascii')))
+            try:
+                device.append(float(payload.split(b',', 1)[0]))
+            except ValueError:
+                device.append(np.nan)
+    device = np.array(device)
+    numeric = np.isfinite(device)
+    times = np.array(clock)
+    if np.count_nonzero(numeric) > 1 and np.all(np.diff(device[numeric]) > 0):
+        # rows that are not telemetry (e.g. console hex dumps) inherit the previous device time
+        times = np.fmax.accumulate(np.where(numeric, device, -np.inf))
+        times[~np.isfinite(times)] = device[numeric][0]
+    if layout is not None:
+        rows, garbled = parse_text_records([chunk.rstrip() for chunk, keep in zip(chunks, numeric) if keep])
+        return _rows_to_chunks(times[numeric][:len(rows)], rows, layout)
+    return list(zip(times - times[0], chunks))
+
+
+def _rows_to_chunks(times, rows, layout):
+    times = np.asarray(times, dtype=float)
+    times = times - times[0] if len(times) else times
+    if layout is not None:
+        blob = layout.encode(rows)
+        return [(t, blob[idx * layout.size:(idx + 1) * layout.size]) for idx, t in enumerate(times)]
+    return [(t, (', '.join('%f' % value for value in row) + '\n').encode('ascii')) for t, row in zip(times, rows)]
+
+
+def synthetic_session(samples, rate=100.0, layout=None, seed=0):
+    """A generated session of MTQ time + Gyro X/Y/Z samples at rate Hz, for benchmarks."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(samples) / rate
+    rows = np.column_stack([465.4 + times, rng.normal(0.8, 0.05, samples), rng.normal(-1.0, 0.05, samples), rng.normal(-0.1, 0.05, samples)])
+    return _rows_to_chunks(times, rows, layout)
+
+
+class Pacer:
+    """Releases session chunks at speed x their recorded spacing on a background thread.
+
+    sink(data) receives each chunk; speed 0 releases everything as fast as
+    the sink accepts it. The release wall time and running byte count of each
+    chunk are kept so consumers can compute end-to-end latency.
+    """
+
+    def __init__(self, chunks, sink, speed=1.0):
+        self.chunks = chunks
+        self.sink = sink
+        self.speed = speed
+        self.total_bytes = sum(len(data) for t, data in chunks)
+        self.released_at = []
+        self.released_bytes = []
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replay", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        start = time.monotonic()
+        sent = 0
+        for t, data in self.chunks:
+            if self.speed:
+                delay = start + t / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.sink(data)
+            sent += len(data)
+            self.released_at.append(time.time())
+            self.released_bytes.append(sent)
+        self.done.set()
+
+    def release_time(self, offset):
+        # wall time at which the byte at stream offset was handed to the port
+        idx = bisect.bisect_left(self.released_bytes, offset)
+        return self.released_at[min(idx, len(self.released_at) - 1)]
+
+
+class ReplayPort:
+    """In-process stand-in for serial.Serial fed by a Pacer; written bytes are collected in tx."""
+
+    def __init__(self, timeout=0.1):
+        self.timeout = timeout
+        self.tx = bytearray()
+        self._rx = bytearray()
+        self._cond = threading.Condition()
+
+    def feed(self, data):
+        with self._cond:
+            self._rx += data
+            self._cond.notify_all()
+
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def read(self, size=1):
+        with self._cond:
+            self._cond.wait_for(lambda: self._rx, self.timeout)
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+            return data
+
+    def write(self, data):
+        self.tx += data
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def open_pty_port(timeout=0.1):
+    """Opens a virtual serial port pair; returns (master fd for the device side, serial.Serial on the slave)."""
+    master, slave = os.openpty()
+    port = serial.Serial(os.ttyname(slave), timeout=timeout)
+    os.close(slave)
+    return master, port
+
+
+def _pty_writer(master):
+    def sink(data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(master, view):]
+    return sink
+
+
+class StageStats:
+    """Wall time and sample counts of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0
+        self.calls = 0
+        self.samples = 0
+
+    def add(self, seconds):
+        self.wall += seconds
+        self.calls += 1
+
+    def report(self):
+        rate = self.samples / self.wall if self.wall else float('inf')
+        return f"{self.name:<10} {self.calls:>8} calls {self.samples:>10} samples {self.wall * 1000:>10.1f} ms wall {rate:>14.0f} samples/s"
+
+
+class HeadlessPipeline:
+    """The GUI data path (ingest -> decode -> store -> render/console/recorder) without Tk.
+
+    step() does what one Tk main loop frame does in MTQtesterApp, with the
+    same code: feed_store() drains the plot subscription into the
+    TelemetryStore, the PlotRenderer draws onto an Agg canvas and a
+    widgetless ConsoleView formats the console text. The pipeline is the
+    stats sink of all three, like PipelineStats is in the app, so the
+    per-stage timings are those of the GUI code.
+    """
+
+    def __init__(self, port, layout=None, window=3000, fps=30, render=True, record_dir=None, fmt="csv", console_mode="Hex"):
+        self.layout = layout
+        self.fps = fps
+        framer = BinaryFramer(layout) if layout is not None else LineFramer()
+        self.decode = layout.decode if layout is not None else parse_text_records
+        # framing strips the line terminator, which still counts towards the stream offset
+        self.record_overhead = 0 if layout is not None else 1
+        self.terminator = b'' if layout is not None else b'\n'
+        self.ingest = SerialIngest(port, framer=framer)
+        self.plot_queue = self.ingest.subscribe(maxsize=65536)
+        self.console_queue = self.ingest.subscribe(maxsize=65536)
+        self.store = TelemetryStore(capacity=60000)
+        self.stages = {name: StageStats(name) for name in ("decode", "store", "render", "console")}
+        self.samples = 0
+        self.garbled = 0
+        self.latencies = []
+        self.renderer = None
+        if render:
+            fig = Figure()
+            ax = fig.add_subplot(111)
+            self.renderer = PlotRenderer(None, FigureCanvasAgg(fig), ax, self.store, window=window, fps=fps, stats=self)
+        self.console = ConsoleView(None, mode=console_mode, stats=self)
+        self.recorder = None
+        if record_dir is not None:
+            self.recorder = Recorder(record_dir, fmt=fmt, decode=self.decode)
+            self.recorder.attach(self.ingest)
+        self._stream_offset = 0
+        self._pacer = None
+
+    def record(self, stage, seconds):
+        # stats hook of feed_store, PlotRenderer and ConsoleView; queue latency is measured against the pacer instead
+        if stage in self.stages:
+            self.stages[stage].add(seconds)
+
+    def start(self):
+        if self.recorder is not None:
+            self.recorder.start()
+        self.ingest.start()
+
+    def stop(self):
+        self.ingest.stop()
+        if self.recorder is not None:
+            return self.recorder.finalize()
+        return []
+
+    def _on_rows(self, batch, rows):
+        self.stages["decode"].samples += len(rows)
+        self.stages["store"].samples += len(rows)
+        self._stream_offset += sum(len(record) for record in batch.records) + self.record_overhead * len(batch.records)
+        if self._pacer is not None and len(rows):
+            latency = time.time() - self._pacer.release_time(self._stream_offset)
+            self.latencies.extend([latency] * len(rows))
+
+    def step(self, pacer=None):
+        self._pacer = pacer
+        batches = self.plot_queue.drain()
+        feed_store(self.store, batches, self.decode, stats=self, on_rows=self._on_rows)
+        if self.renderer is not None and batches:
+            self.renderer.render()
+            self.stages["render"].samples += sum(len(batch.records) for batch in batches)
+        batches = self.console_queue.drain()
+        self.console.extend_batches(batches, "received", terminator=self.terminator)
+        self.console.flush()
+        self.stages["console"].samples += sum(len(batch.records) for batch in batches)
+
+    def run(self, pacer, timeout=None):
+        period = 1.0 / self.fps
+        started = time.monotonic()
+        while True:
+            frame = time.monotonic()
+            self.step(pacer)
+            if pacer.done.is_set() and self.ingest.bytes_in >= pacer.total_bytes and not self.plot_queue.qsize():
+                self.step(pacer)
+                break
+            if timeout is not None and frame - started > timeout:
+                break
+            if self.ingest.error is not None:
+                raise self.ingest.error
+            time.sleep(max(0.0, period - (time.monotonic() - frame)))
+        return time.monotonic() - started
+
+
+def latency_percentiles(latencies, percentiles=(50, 90, 99, 100)):
+    if not latencies:
+        return {}
+    values = np.percentile(np.asarray(latencies) * 1000.0, percentiles)
+    return dict(zip(percentiles, values))
+
+
+def replay(chunks, speed=1.0, layout=None, use_pty=False, fps=30, render=True, record_dir=None, fmt="csv", timeout=None):
+    """Runs chunks through a HeadlessPipeline and returns (pipeline, pacer, elapsed seconds)."""
+    master = None
+    if use_pty:
+        master, port = open_pty_port()
+        sink = _pty_writer(master)
+    else:
+        port = ReplayPort()
+        sink = port.feed
+    pipeline = HeadlessPipeline(port, layout=layout, fps=fps, render=render, record_dir=record_dir, fmt=fmt)
+    pacer = Pacer(chunks, sink, speed=speed)
+    pipeline.start()
+    pacer.start()
+    try:
+        elapsed = pipeline.run(pacer, timeout=timeout)
+    finally:
+        pipeline.stop()
+        port.close()
+        if master is not None:
+            os.close(master)
+    return pipeline, pacer, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured MTQ session without the GUI.")
+    parser.add_argument("path", help="output.csv style CSV, Recorder .npy or _raw.bin capture")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor, 0 = as fast as possible")
+    parser.add_argument("--binary", action="store_true", help="replay as binary telemetry frames")
+    parser.add_argument("--pty", action="store_true", help="feed a virtual serial port instead of an in-process port")
+    parser.add_argument("--fps", type=float, default=30, help="plot frame rate")
+    parser.add_argument("--no-render", action="store_true", help="skip plot rendering")
+    parser.add_argument("--record", metavar="DIR", help="also record the replayed samples to DIR")
+    parser.add_argument("--format", choices=("csv", "npy"), default="csv", help="recording format")
+    args = parser.parse_args()
+
+    layout = FrameLayout() if args.binary else None
+    chunks = load_session(args.path, layout=layout)
+    pipeline, pacer, elapsed = replay(chunks, speed=args.speed, layout=layout, use_pty=args.pty, fps=args.fps,
+                                      render=not args.no_render, record_dir=args.record, fmt=args.format)
+    samples = pipeline.stages["decode"].samples
+    print(f"replayed {len(chunks)} chunks, {samples} samples in {elapsed:.2f} s ({samples / elapsed:.0f} samples/s), {pipeline.garbled} garbled")
+    for stats in pipeline.stages.values():
+        print(stats.report())
+    for pct, value in latency_percentiles(pipeline.latencies).items():
+        print(f"latency p{pct}: {value:.2f} ms")
+    if pipeline.recorder is not None:
+        print("recorded to", ", ".join(str(path) for path in pipeline.recorder.paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+POWER_COMMAND = "MTQ Set Power"
+
+
+def load_profile(path):
+    """Reads a test profile: a JSON list of steps, see CommandSequencer.build()."""
+    with open(path) as f:
+        profile = json.load(f)
+    if not isinstance(profile, list):
+        raise ValueError("A profile is a JSON list of steps")
+    return profile
+
+
+class CommandSequencer:
+    """Runs scripted MTQ test profiles with timing from a monotonic clock.
+
+    A profile is a list of steps, each a dict with one of these keys:
+
+        {"command": "MTQ ON"}                                   any key of MTQ_ctrl_commands
+        {"power": [x, y, z]}                                    one MTQ Set Power frame
+        {"ramp": {"from": [x, y, z], "to": [x, y, z], "duration": s, "rate": hz}}
+        {"sine": {"amplitude": [x, y, z], "offset": [x, y, z], "frequency": hz, "duration": s, "rate": hz}}
+        {"wait": s}
+
+    plus an optional "hold": s pause after the step. build() turns the profile
+    into (time offset, label, frame) tuples with every frame encoded up front,
+    so the run loop only waits and sends. Send times are compared with the
+    schedule and kept in jitter (seconds, positive = late).
+    """
+
+    def __init__(self, send, encode, commands, min_power=-2000, max_power=2000):
+        self.send = send
+        self.encode = encode
+        self.commands = commands
+        self.min_power = min_power
+        self.max_power = max_power
+        self.schedule = []
+        self.jitter = []
+        self.sent = 0
+        self.error = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _power_frames(self, values):
+        # values is an (n, 3) array of X/Y/Z power, clamped to the slider range and sent as int16
+        reg_id = self.commands[POWER_COMMAND][0]
+        values = np.clip(np.rint(values), self.min_power, self.max_power).astype(int)
+        return [self.encode(reg_id, [int(x), int(y), int(z)]) for x, y, z in values]
+
+    def build(self, profile):
+        schedule = []
+        t = 0.0
+        for number, step in enumerate(profile, 1):
+            if "command" in step:
+                name = step["command"]
+                if name not in self.commands:
+                    raise ValueError(f"Step {number}: unknown command {name!r}")
+                if name == POWER_COMMAND:
+                    raise ValueError(f"Step {number}: use a power, ramp or sine step for {POWER_COMMAND}")
+                reg_id, data = self.commands[name]
+                schedule.append((t, name, self.encode(reg_id, data)))
+            elif "power" in step:
+                frame, = self._power_frames(np.array([step["power"]], dtype=float))
+                schedule.append((t, f"power {step['power']}", frame))
+            elif "ramp" in step or "sine" in step:
+                kind = "ramp" if "ramp" in step else "sine"
+                spec = step[kind]
+                duration, rate = float(spec["duration"]), float(spec.get("rate", 10))
+                if not rate > 0 or not duration >= 0:
+                    raise ValueError(f"Step {number}: {kind} needs a rate above 0 and a duration of at least 0")
+                offsets = np.arange(int(duration * rate) + 1) / rate
+                if kind == "ramp":
+                    start, end = np.array(spec["from"], dtype=float), np.array(spec["to"], dtype=float)
+                    values = start + np.outer(offsets / duration if duration else np.ones_like(offsets), end - start)
+                else:
+                    amplitude = np.array(spec["amplitude"], dtype=float)
+                    offset = np.array(spec.get("offset", [0, 0, 0]), dtype=float)
+                    values = offset + np.outer(np.sin(2 * math.pi * float(spec["frequency"]) * offsets), amplitude)
+                frames = self._power_frames(values)
+                schedule.extend((t + dt, f"{kind} {idx + 1}/{len(frames)}", frame) for idx, (dt, frame) in enumerate(zip(offsets, frames)))
+                t += duration
+            elif "wait" not in step:
+                raise ValueError(f"Step {number}: expected command, power, ramp, sine or wait")
+            t += float(step.get("wait", 0)) + float(step.get("hold", 0))
+        return schedule
+
+    def start(self, profile):
+        if self.is_running():
+            raise RuntimeError("A profile is already running")
+        self.schedule = self.build(profile)
+        self.jitter = []
+        self.sent = 0
+        self.error = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sequencer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        start = time.monotonic() + 0.05   # small lead so the first frame is not already late
+        try:
+            for offset, label, frame in self.schedule:
+                target = start + offset
+                # sleep most of the way, then spin the last millisecond for a precise send time
+                remaining = target - time.monotonic()
+                if remaining > 0.002 and self._stop_event.wait(remaining - 0.001):
+                    return
+                while time.monotonic() < target:
+                    pass
+                if self._stop_event.is_set():
+                    return
+                self.jitter.append(time.monotonic() - target)
+                self.send(frame)
+                self.sent += 1
+        except Exception as e:
+            self.error = e
+
+    def jitter_stats(self):
+        # (mean, p99, max) send jitter in milliseconds
+        if not self.jitter:
+            return 0.0, 0.0, 0.0
+        jitter = np.abs(np.asarray(self.jitter)) * 1000.0
+        return jitter.mean(), np.percentile(jitter, 99), jitter.max()
+
+
+class CoalescingSender:
+    """Sends at most max_rate frames per second, always the latest one submitted.
+
+    Used for live slider mode: every slider step submits a frame, but only the
+    most recent value is sent once the rate limit allows; the ones it replaced
+    are counted in coalesced.
+    """
+
+    def __init__(self, send, max_rate=20.0):
+        self.send = send
+        self.interval = 1.0 / max_rate
+        self.sent = 0
+        self.coalesced = 0
+        self._latest = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="live-sender", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        with self._cond:
+            if self._latest is not None:
+                self.coalesced += 1
+            self._latest = frame
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._latest is not None or self._stopped)
+                if self._stopped:
+                    return
+                frame, self._latest = self._latest, None
+            self.send(frame)
+            self.sent += 1
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopped, self.interval):
+                    return
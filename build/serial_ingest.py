@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import serial
+
+# One chunk of framed records, stamped with the wall clock time the bytes came off the port
+Batch = namedtuple("Batch", ["time", "records"])
+
+
+class LineFramer:
+    """Splits a byte stream into terminator delimited records, keeping the partial tail between reads."""
+
+    def __init__(self, terminator=b'\n', max_length=4096):
+        self.terminator = terminator
+        self.max_length = max_length
+        self.buffer = bytearray()
+        self.overruns = 0
+
+    def feed(self, data):
+        buf = self.buffer
+        start = len(buf)
+        buf += data
+        # only the newly appended bytes (plus a terminator straddling the boundary) need scanning
+        pos = buf.find(self.terminator, max(0, start - len(self.terminator) + 1))
+        if pos < 0:
+            if len(buf) > self.max_length:
+                # garbage without a terminator, drop it instead of growing forever
+                del buf[:]
+                self.overruns += 1
+            return []
+        end = buf.rfind(self.terminator) + len(self.terminator)
+        records = bytes(buf[:end]).split(self.terminator)
+        records.pop()
+        del buf[:end]
+        return records
+
+    def reset(self):
+        del self.buffer[:]
+
+
+class BatchQueue:
+    """Bounded FIFO between the ingest threads and a consumer.
+
+    overflow is one of "drop_oldest", "drop_newest" or "block" and decides what
+    happens to a put() when the consumer has fallen maxsize batches behind.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(self, maxsize=256, overflow="drop_oldest"):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item, timeout=None):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._cond.wait_for(lambda: len(self._items) < self.maxsize, timeout):
+                    self.dropped += 1
+                    return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def drain(self):
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+            return items
+
+    def clear(self):
+        self.drain()
+
+    def qsize(self):
+        return len(self._items)
+
+
+class SerialIngest:
+    """Reads and writes a serial port on two dedicated threads.
+
+    The reader blocks in port.read() until data or the port timeout arrives, so
+    it does not spin when the line is idle. Framed records are published as
+    Batch tuples to every subscribed BatchQueue. Writes are queued and sent by
+    the writer thread, so they never wait on the reader.
+    """
+
+    def __init__(self, port, framer=None, read_size=4096):
+        self.port = port
+        self.framer = framer if framer is not None else LineFramer()
+        self.read_size = read_size
+        if getattr(port, "timeout", 1) is None:
+            # a timeout-less port would block forever in read() and never see stop()
+            port.timeout = 0.1
+        self.error = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.records_in = 0
+        self._subscribers = []
+        self._raw_listeners = []
+        self._tx_queue = BatchQueue(maxsize=1024, overflow="block")
+        self._stop_event = threading.Event()
+        self._read_thread = None
+        self._write_thread = None
+
+    def subscribe(self, maxsize=256, overflow="drop_oldest"):
+        subscription = BatchQueue(maxsize, overflow)
+        # copy-on-write so the reader can iterate without a lock
+        self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    def add_raw_listener(self, callback):
+        # callback(direction, time, data) with direction "rx" or "tx", called from the ingest threads
+        self._raw_listeners = self._raw_listeners + [callback]
+
+    def remove_raw_listener(self, callback):
+        self._raw_listeners = [c for c in self._raw_listeners if c != callback]
+
+    def start(self):
+        self._stop_event.clear()
+        self.error = None
+        self.framer.reset()
+        self._read_thread = threading.Thread(target=self._read_loop, name="serial-read", daemon=True)
+        self._write_thread = threading.Thread(target=self._write_loop, name="serial-write", daemon=True)
+        self._read_thread.start()
+        self._write_thread.start()
+
+    def stop(self, timeout=1):
+        self._stop_event.set()
+        self._tx_queue.put(None, timeout=timeout)  # wake the writer
+        for thread in (self._read_thread, self._write_thread):
+            if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+
+    def is_running(self):
+        return self._read_thread is not None and self._read_thread.is_alive()
+
+    def write(self, data, timeout=1):
+        if self._stop_event.is_set():
+            return False
+        return self._tx_queue.put(bytes(data), timeout=timeout)
+
+    def _publish(self, records):
+        self.records_in += len(records)
+        batch = Batch(time.time(), records)
+        for subscription in self._subscribers:
+            subscription.put(batch)
+
+    def _read_loop(self):
+        port = self.port
+        feed = self.framer.feed
+        while not self._stop_event.is_set():
+            try:
+                # read(1) blocks up to port.timeout; anything already buffered comes out in one call
+                data = port.read(min(max(port.in_waiting, 1), self.read_size))
+            except (serial.SerialException, OSError) as e:
+                self.error = e
+                self._stop_event.set()
+                break
+            if not data:
+                continue
+            self.bytes_in += len(data)
+            for callback in self._raw_listeners:
+                callback("rx", time.time(), data)
+            records = feed(data)
+            if records:
+                self._publish(records)
+
+    def _write_loop(self):
+        port = self.port
+        while not self._stop_event.is_set():
+            data = self._tx_queue.get(timeout=0.5)
+            if not data:
+                continue
+            try:
+                port.write(data)
+            except (serial.SerialException, OSError) as e:
+                self.error = e
+                self._stop_event.set()
+                break
+            self.bytes_out += len(data)
+            for callback in self._raw_listeners:
+                callback("tx", time.time(), data)
@@ -0,0 +1,226 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_CHANNELS = ("MTQ time", "Gyro X", "Gyro Y", "Gyro Z")
+
+
+class TelemetryStore:
+    """Fixed capacity, column oriented ring buffer of timestamped telemetry samples.
+
+    Row 0 holds the timestamp (seconds since the epoch), one row per channel
+    follows. Every sample is written twice, at slot and slot + capacity, so the
+    newest n samples are always one contiguous slice and window() can hand out
+    views without copying. Per-block min/max are kept as samples arrive, which
+    keeps minmax() cheap for windows of any size.
+    """
+
+    def __init__(self, capacity=60000, channels=DEFAULT_CHANNELS, block_size=256):
+        # round capacity up to whole blocks so block boundaries survive the wrap
+        self.block_size = block_size
+        self.capacity = -(-capacity // block_size) * block_size
+        self.channels = list(channels)
+        self._n_blocks = self.capacity // block_size
+        self._allocate(len(self.channels))
+        self.clear()
+
+    def _allocate(self, n_channels):
+        self._buf = np.full((n_channels + 1, 2 * self.capacity), np.nan)
+        self._block_min = np.full((n_channels + 1, self._n_blocks), np.nan)
+        self._block_max = np.full((n_channels + 1, self._n_blocks), np.nan)
+
+    def clear(self):
+        self._buf.fill(np.nan)
+        self._block_min.fill(np.nan)
+        self._block_max.fill(np.nan)
+        self._written = 0
+        self.version = 0
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def add_channels(self, count):
+        # unexpected extra values in a sample get their own "Value N" channel
+        old_buf, old_min, old_max = self._buf, self._block_min, self._block_max
+        rows = old_buf.shape[0]
+        for idx in range(count):
+            self.channels.append(f"Value {len(self.channels) + 1}")
+        self._allocate(len(self.channels))
+        self._buf[:rows] = old_buf
+        self._block_min[:rows] = old_min
+        self._block_max[:rows] = old_max
+
+    def append(self, timestamp, values):
+        n_values = len(values)
+        if n_values > len(self.channels):
+            self.add_channels(n_values - len(self.channels))
+        slot = self._written % self.capacity
+        column = self._buf[:, slot]
+        column[0] = timestamp
+        column[1:n_values + 1] = values
+        column[n_values + 1:] = np.nan
+        self._buf[:, slot + self.capacity] = column
+
+        block = slot // self.block_size
+        if slot % self.block_size == 0:
+            self._block_min[:, block] = column
+            self._block_max[:, block] = column
+        else:
+            np.fmin(self._block_min[:, block], column, out=self._block_min[:, block])
+            np.fmax(self._block_max[:, block], column, out=self._block_max[:, block])
+        self._written += 1
+        self.version += 1
+
+    def extend(self, timestamps, rows):
+        # rows is an (n, k) array of channel values, timestamps has n entries
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim != 2 or not len(rows):
+            return
+        if rows.shape[1] > len(self.channels):
+            self.add_channels(rows.shape[1] - len(self.channels))
+        if len(rows) > self.capacity:
+            skipped = len(rows) - self.capacity
+            self._written += skipped
+            timestamps = np.asarray(timestamps)[skipped:]
+            rows = rows[skipped:]
+        width = rows.shape[1]
+        done = 0
+        while done < len(rows):
+            slot = self._written % self.capacity
+            count = min(len(rows) - done, self.capacity - slot)
+            chunk = self._buf[:, slot:slot + count]
+            chunk[0] = timestamps[done:done + count]
+            chunk[1:width + 1] = rows[done:done + count].T
+            chunk[width + 1:] = np.nan
+            self._buf[:, slot + self.capacity:slot + self.capacity + count] = chunk
+            self._update_blocks(slot, count)
+            self._written += count
+            done += count
+        self.version += 1
+
+    def _update_blocks(self, slot, count):
+        size = self.block_size
+        end = slot + count
+        block_start = slot - slot % size
+        while block_start < end:
+            block = block_start // size
+            lo, hi = max(slot, block_start), min(end, block_start + size)
+            part = self._buf[:, lo:hi]
+            part_min, part_max = np.fmin.reduce(part, axis=1), np.fmax.reduce(part, axis=1)
+            if lo == block_start:
+                self._block_min[:, block] = part_min
+                self._block_max[:, block] = part_max
+            else:
+                np.fmin(self._block_min[:, block], part_min, out=self._block_min[:, block])
+                np.fmax(self._block_max[:, block], part_max, out=self._block_max[:, block])
+            block_start += size
+
+    def _span(self, n):
+        n = len(self) if n is None else min(n, len(self))
+        end = (self._written - 1) % self.capacity + 1 + self.capacity if self._written else self.capacity
+        return end - n, end
+
+    def window(self, n=None):
+        # zero-copy views of the newest n samples: (timestamps, channel rows)
+        start, end = self._span(n)
+        view = self._buf[:, start:end]
+        return view[0], view[1:]
+
+    def column(self, name, n=None):
+        start, end = self._span(n)
+        return self._buf[self.channels.index(name) + 1, start:end]
+
+    def minmax(self, channels=None, n=None):
+        # min/max over the newest n samples of the given channel indices (all channels by default)
+        rows = np.arange(1, len(self.channels) + 1) if channels is None else np.asarray(channels, dtype=int) + 1
+        start, end = self._span(n)
+        if start == end or not len(rows):
+            return np.nan, np.nan
+        size = self.block_size
+        first_full = -(-start // size) * size
+        last_full = end // size * size
+        parts = []
+        if first_full >= last_full:
+            parts.append(self._buf[rows, start:end])
+        else:
+            parts.append(self._buf[rows, start:first_full])
+            parts.append(self._buf[rows, last_full:end])
+            blocks = np.arange(first_full // size, last_full // size) % self._n_blocks
+            lows = self._block_min[np.ix_(rows, blocks)]
+            highs = self._block_max[np.ix_(rows, blocks)]
+            parts.extend((lows, highs))
+        # fmin/fmax skip NaN (missing channels) without all-NaN warnings
+        parts = [part.ravel() for part in parts if part.size]
+        values = np.concatenate(parts)
+        return np.fmin.reduce(values), np.fmax.reduce(values)
+
+    def time_span(self, n=None):
+        start, end = self._span(n)
+        if start == end:
+            return np.nan, np.nan
+        return self._buf[0, start], self._buf[0, end - 1]
+
+
+def parse_text_records(records, width=len(DEFAULT_CHANNELS)):
+    """Parses comma separated device lines into an (n, k) float array.
+
+    Returns (rows, garbled) where garbled counts lines that could not be parsed.
+    A batch whose lines all have the same field count is converted in one
+    NumPy call; anything irregular falls back to line by line parsing, which
+    keeps the most common field count (ties go to width, then the widest).
+    """
+    records = [record for record in records if record.strip()]
+    if not records:
+        return np.empty((0, 0)), 0
+    widths = {record.count(b',') for record in records}
+    if len(widths) == 1:
+        try:
+            values = np.array(b','.join(records).split(b',')).astype(float)
+            return values.reshape(len(records), widths.pop() + 1), 0
+        except ValueError:
+            pass
+    rows = []
+    garbled = 0
+    for record in records:
+        try:
+            rows.append([float(value) for value in record.split(b',')])
+        except ValueError:
+            garbled += 1
+    if rows:
+        # keep the most common width, shorter/longer lines are counted as garbled
+        counts = Counter(len(row) for row in rows)
+        keep = max(counts, key=lambda candidate: (counts[candidate], candidate == width, candidate))
+        kept = [row for row in rows if len(row) == keep]
+        garbled += len(rows) - len(kept)
+        return np.array(kept), garbled
+    return np.empty((0, 0)), garbled
+
+
+def feed_store(store, batches, decode=parse_text_records, stats=None, on_rows=None):
+    """Decodes ingest batches into store: the decode -> store step shared by the GUI and headless replay.
+
+    stats (a PipelineStats or anything with record(stage, seconds) and
+    samples/garbled counters) gets the queue, decode and store timings.
+    on_rows(batch, rows) is called once a batch is stored. Returns the number
+    of samples added.
+    """
+    added = 0
+    for batch in batches:
+        started = time.perf_counter()
+        if stats is not None:
+            stats.record("queue", time.time() - batch.time)
+        rows, garbled = decode(batch.records)
+        decoded = time.perf_counter()
+        if stats is not None:
+            stats.record("decode", decoded - started)
+            stats.garbled += garbled
+        if len(rows):
+            store.extend(np.full(len(rows), batch.time), rows)
+            added += len(rows)
+            if stats is not None:
+                stats.samples += len(rows)
+                stats.record("store", time.perf_counter() - decoded)
+        if on_rows is not None:
+            on_rows(batch, rows)
+    return added
@@ -0,0 +1,80 @@
+import pytest
+
+from console_view import ConsoleView, format_payload
+
+
+class TextStandIn:
+    """Just enough of tkinter.Text for ConsoleView: text/tag pair inserts, line indexes and deletes."""
+
+    def __init__(self):
+        self.text = ""
+        self.tags = []
+        self.inserts = 0
+
+    def insert(self, index, *chunks):
+        assert index == 'end'
+        self.inserts += 1
+        self.text += "".join(chunks[0::2])
+        self.tags.extend(chunks[1::2])
+
+    def index(self, index):
+        assert index == 'end-1c'
+        lines = self.text.split("\n")
+        return f"{len(lines)}.{len(lines[-1])}"
+
+    def delete(self, start, end):
+        if end == 'end':
+            self.text = ""
+            return
+        # 'N.0': everything before line N
+        self.text = "\n".join(self.text.split("\n")[int(end.split('.')[0]) - 1:])
+
+    def yview(self, *args):
+        pass
+
+
+def test_format_payload_modes():
+    assert format_payload(b"1,2\n", "Utf8") == "1,2\n"
+    assert format_payload(b"\x01\xff\n", "Hex") == "01  ff  0a\n"
+    assert format_payload(b"\x01\xff", "Dec") == "001  255\n"
+    assert format_payload(b"\x05", "Binary") == "00000101\n"
+    with pytest.raises(UnicodeDecodeError):
+        format_payload(b"\xff", "Utf8")
+
+
+def test_flush_inserts_once_and_trims_to_max_lines():
+    text = TextStandIn()
+    console = ConsoleView(text, max_lines=5, history=100)
+    console.extend([b"line %d" % idx for idx in range(8)], "received", 0.0)
+    console.append(b"\xff\n", "received", 0.0)
+    console.flush()
+    assert text.inserts == 1
+    # the empty line after the last newline counts towards max_lines
+    lines = text.text.split("\n")
+    assert len(lines) == 5
+    assert [line.split(", ")[-1] for line in lines[:-1]] == ["line 5", "line 6", "line 7", "Message decoding error"]
+    assert console.decode_errors == 1
+    console.flush()   # nothing pending
+    assert text.inserts == 1
+
+
+def test_set_mode_rerenders_history():
+    text = TextStandIn()
+    console = ConsoleView(text, max_lines=50, history=3)
+    console.extend([b"A", b"B", b"C", b"D"], "received", 0.0)
+    console.flush()
+    console.set_mode("Hex")
+    # only the history ring (3 entries) survives the re-render
+    assert text.text.count("\n") == 3
+    assert "42  0a" in text.text and "41  0a" not in text.text
+    console.clear()
+    assert text.text == "" and not console.history
+
+
+def test_console_without_textbox_only_formats():
+    console = ConsoleView(None, mode="Hex")
+    console.extend([b"A"], "received", 0.0)
+    console.flush()
+    console.rerender()
+    console.clear()
+    assert not console.history
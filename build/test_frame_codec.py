@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from frame_codec import BinaryFramer, FrameLayout
+
+
+@pytest.mark.parametrize("checksum", ["sum8", "xor8", None])
+def test_encode_decode_round_trip(checksum):
+    layout = FrameLayout(checksum=checksum)
+    rows = np.arange(20, dtype=float).reshape(5, 4) / 4
+    stream = layout.encode(rows)
+    assert len(stream) == 5 * layout.size
+    frames = [stream[idx:idx + layout.size] for idx in range(0, len(stream), layout.size)]
+    assert all(layout.valid_frame(frame) for frame in frames)
+    assert layout.valid(np.frombuffer(stream, dtype=np.uint8).reshape(5, layout.size)).all()
+    decoded, garbled = layout.decode(frames + [b"short"])
+    np.testing.assert_array_equal(decoded, rows)
+    assert garbled == 1
+
+
+def test_binary_framer_recovers_after_corrupt_bytes():
+    layout = FrameLayout()
+    rows = np.arange(40, dtype=float).reshape(10, 4)
+    good = layout.encode(rows)
+    corrupt = bytearray(layout.encode([[1, 2, 3, 4]]))
+    corrupt[5] ^= 0xFF   # checksum mismatch
+    stream = good[:3 * layout.size] + b'\x00#T\x20#' + bytes(corrupt) + good[3 * layout.size:] + layout.sync
+    for chunk_size in (1, 7, layout.size, len(stream)):
+        framer = BinaryFramer(layout)
+        frames = []
+        for idx in range(0, len(stream), chunk_size):
+            frames.extend(framer.feed(stream[idx:idx + chunk_size]))
+        decoded, garbled = layout.decode(frames)
+        np.testing.assert_array_equal(decoded, rows)
+        assert not garbled
+        assert framer.corrupt_frames >= 2
+        assert bytes(framer.buffer) == layout.sync
+
+
+def test_binary_framer_validation_run_stays_bounded():
+    layout = FrameLayout()
+    frame = layout.encode([[1, 2, 3, 4]])
+    framer = BinaryFramer(layout)
+    for idx in range(200):
+        assert len(framer.feed(frame)) == 1
+    assert framer._run == BinaryFramer.MAX_RUN
@@ -0,0 +1,62 @@
+import json
+import types
+
+import instrumentation
+from instrumentation import LatencyHistogram, PipelineStats, StatsExporter, format_hud
+from serial_ingest import BatchQueue, LineFramer
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    for idx in range(90):
+        histogram.add(10e-6)
+    for idx in range(10):
+        histogram.add(5e-3)
+    # upper edge of the log2 bucket, capped at the largest value seen
+    assert histogram.percentile(50) == 16e-6
+    assert histogram.percentile(90) == 16e-6
+    assert histogram.percentile(99) == 5e-3
+    assert histogram.summary() == {"count": 100, "p50_ms": 0.016, "p99_ms": 5.0, "max_ms": 5.0}
+    histogram.add(0.0)
+    histogram.add(3600.0)   # past the last bucket
+    assert histogram.count == 102 and histogram.percentile(100) == 3600.0
+    histogram.reset()
+    assert histogram.count == 0 and histogram.max == 0.0
+
+
+def test_snapshot_reports_rates_since_the_previous_snapshot(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(instrumentation.time, "monotonic", lambda: clock[0])
+    stats = PipelineStats()
+    ingest = types.SimpleNamespace(bytes_in=0, bytes_out=0, records_in=0, framer=LineFramer())
+    renderer = types.SimpleNamespace(frames=0)
+    queue = BatchQueue(maxsize=1)
+    stats.attach(ingest, {"plot": queue})
+    stats.renderer = renderer
+
+    ingest.bytes_in, ingest.records_in, renderer.frames = 2000, 100, 30
+    stats.samples += 100
+    stats.record("decode", 0.002)
+    queue.put(1)
+    queue.put(2)
+    clock[0] = 102.0
+    snapshot = stats.snapshot()
+    assert (snapshot["bytes_per_s"], snapshot["lines_per_s"], snapshot["samples_per_s"], snapshot["fps"]) == (1000.0, 50.0, 50.0, 15.0)
+    assert snapshot["queue_depth"] == {"plot": 1} and snapshot["dropped"] == {"plot": 1}
+    assert snapshot["latency"]["decode"]["count"] == 1
+
+    ingest.bytes_in, renderer.frames = 2500, 40
+    clock[0] = 103.0
+    snapshot = stats.snapshot()
+    assert (snapshot["bytes_per_s"], snapshot["lines_per_s"], snapshot["fps"]) == (500.0, 0.0, 10.0)
+    assert snapshot["latency"]["decode"]["count"] == 0   # histograms reset per snapshot
+    assert "RX 0.5 kB/s" in format_hud(snapshot)
+
+
+def test_stats_exporter_writes_json_lines(tmp_path):
+    exporter = StatsExporter(tmp_path / "stats.jsonl")
+    exporter.write({"fps": 30})
+    exporter.write({"fps": 29})
+    exporter.close()
+    assert [json.loads(line)["fps"] for line in (tmp_path / "stats.jsonl").read_text().splitlines()] == [30, 29]
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from log_viewer import LogViewer, MinMaxPyramid, SessionLog, lttb, window_stats
+from recorder import Recorder
+from serial_ingest import Batch
+
+
+def _record(directory, fmt, batches=100, per_batch=10):
+    # 100 Hz device clock, delivered in batches that share one arrival time
+    recorder = Recorder(directory, fmt=fmt, raw_log=False)
+    now = time.time()
+    for batch in range(batches):
+        device_time = 465.0 + (batch * per_batch + np.arange(per_batch)) * 0.01
+        records = [b"%f, %f, %f, %f" % (t, np.sin(t), 0.5 * t, -1.0) for t in device_time]
+        recorder.write_batch(Batch(now + batch * 0.1, records))
+    path, = recorder.finalize()
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_recordings_use_the_device_clock(tmp_path, fmt):
+    log = SessionLog.load(_record(tmp_path, fmt))
+    assert len(log) == 1000
+    assert log.channels == ["MTQ time", "Gyro X", "Gyro Y", "Gyro Z"]
+    np.testing.assert_allclose(np.diff(log.times), 0.01, atol=1e-5)
+    starts, means, rms, drift = window_stats(log.times, log.values, 1.0)
+    assert len(starts) == 10
+    np.testing.assert_allclose(drift[:, 2], 0.5, rtol=1e-3)
+
+
+def test_csv_log_skips_console_dumps(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("Timestamp,MTQ time,Gyro X,Gyro Y,Gyro Z\n"
+                    "14:44:45, 465.40, 0.84, -1.05, -0.14\n"
+                    "14:44:55, 34  37  35  2e  35  0d  0a\n"
+                    "14:44:45.500, 465.50, 0.84, -1.05, -0.07\n")
+    log = SessionLog.load(path)
+    np.testing.assert_array_equal(log.times, [465.4, 465.5])
+    assert (tmp_path / "log.cache.npy").exists()
+    reloaded = SessionLog.load(path)   # from the memory mapped cache
+    assert isinstance(reloaded.values, np.memmap)
+    np.testing.assert_array_equal(reloaded.values, log.values)
+
+
+def test_window_stats_matches_reference():
+    times = np.arange(1000) * 0.01
+    values = np.column_stack([2.0 + 0.5 * times, np.sin(times * 20)])
+    starts, means, rms, drift = window_stats(times, values, 1.0)
+    assert len(starts) == 10
+    for idx, start in enumerate(starts):
+        window = slice(idx * 100, (idx + 1) * 100)
+        np.testing.assert_allclose(means[idx], values[window].mean(axis=0))
+        np.testing.assert_allclose(rms[idx], np.sqrt((values[window] ** 2).mean(axis=0)))
+        np.testing.assert_allclose(drift[idx], [np.polyfit(times[window], values[window, col], 1)[0] for col in range(2)], atol=1e-9)
+
+
+def test_pyramid_keeps_spikes_at_every_zoom():
+    times = np.arange(200000) * 0.01
+    values = np.column_stack([np.sin(times), np.zeros_like(times)])
+    values[123457, 1] = 9.0
+    pyramid = MinMaxPyramid(times, values)
+    assert pyramid.levels
+    x, y = pyramid.visible(times[0], times[-1], 500, 1)
+    assert len(x) <= 2 * len(pyramid.levels[-1][1]) and y.max() == 9.0
+    for span in (200.0, 20.0, 2.0):
+        x, y = pyramid.visible(1234.57 - span / 2, 1234.57 + span / 2, 500, 1)
+        assert len(x) < 2 * pyramid.factor * 500 + 4
+        assert y.max() == 9.0
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10000.0)
+    y = np.sin(x / 100)
+    y[5000] = 9.0
+    xs, ys = lttb(x, y, 200)
+    assert len(xs) == 200
+    assert (xs[0], xs[-1]) == (0.0, 9999.0)
+    assert ys.max() == 9.0
+
+
+def test_viewer_redraws_the_visible_range(tmp_path):
+    log = SessionLog.load(_record(tmp_path, "npy", batches=500))
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    views = []
+    viewer = LogViewer(fig.add_subplot(111), log, on_view=lambda start, end: views.append((start, end)))
+    line = viewer.lines[1]
+    viewer.ax.set_xlim(470.0, 471.0)
+    assert views[-1] == (470.0, 471.0)
+    # the visible samples plus one either side, so the line reaches the axis edges
+    x = line.get_xdata()
+    assert x[0] < 470.0 <= x[1] and x[-2] <= 471.0 < x[-1] + 0.011
+    assert "samples" in viewer.visible_summary(470.0, 471.0)
+    viewer.disconnect()
+    viewer.ax.set_xlim(480.0, 481.0)
+    assert views[-1] == (470.0, 471.0)
@@ -0,0 +1,58 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from plot_renderer import PlotRenderer
+from telemetry_store import TelemetryStore
+
+
+def _renderer():
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    store = TelemetryStore(capacity=4096, channels=("a", "b"))
+    renderer = PlotRenderer(None, canvas, fig.add_subplot(111), store, window=1000)
+    full_draws, blits = [], []
+    canvas.mpl_connect('draw_event', lambda event: full_draws.append(1))
+    blit = canvas.blit
+    canvas.blit = lambda bbox=None: (blits.append(1), blit(bbox))
+    return renderer, store, full_draws, blits
+
+
+def _extend(store, start, count):
+    times = np.arange(start, start + count, dtype=float)
+    store.extend(times, np.column_stack([np.sin(times), np.cos(times)]))
+
+
+def test_frames_are_blitted_while_data_stays_inside_the_limits():
+    renderer, store, full_draws, blits = _renderer()
+    _extend(store, 0, 100)
+    renderer.render()
+    assert len(full_draws) == 1 and not blits   # first frame creates the lines
+    for start in range(100, 115, 5):
+        _extend(store, start, 5)
+        renderer.render()
+    assert len(full_draws) == 1
+    assert len(blits) == 3
+    renderer.render()   # nothing new, nothing drawn
+    assert renderer.frames == 4
+    np.testing.assert_array_equal(renderer.lines["a"].get_xdata(), np.arange(115))
+
+
+def test_full_draw_when_limits_move_or_a_line_is_toggled():
+    renderer, store, full_draws, blits = _renderer()
+    _extend(store, 0, 100)
+    renderer.render()
+    _extend(store, 500, 5)   # past the x lookahead
+    renderer.render()
+    assert len(full_draws) == 2
+    assert renderer.ax.get_xlim()[1] > 504
+
+    store.extend([505.0], [[50.0, 0.0]])   # past the y limits
+    renderer.render()
+    assert len(full_draws) == 3
+
+    legend_line = renderer._legend.get_lines()[1]
+    renderer._on_pick(type("PickEvent", (), {"artist": legend_line})())
+    assert not renderer.lines["b"].get_visible()
+    assert len(full_draws) == 4
+    assert not blits
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+
+from log_viewer import SessionLog
+from recorder import Recorder, read_raw_log
+from replay import ReplayPort
+from serial_ingest import Batch, SerialIngest
+
+
+def test_recorder_round_trip(tmp_path, wait_for):
+    port = ReplayPort()
+    ingest = SerialIngest(port)
+    recorder = Recorder(tmp_path, fmt="npy", flush_interval=0.05)
+    recorder.attach(ingest)
+    recorder.start()
+    ingest.start()
+    rows = np.arange(400, dtype=float).reshape(100, 4)
+    payload = b"".join(b"%f, %f, %f, %f\n" % tuple(row) for row in rows)
+    port.feed(payload)
+    assert wait_for(lambda: ingest.records_in == len(rows))
+    ingest.stop()
+    npy_path, = [path for path in recorder.finalize() if path.suffix == '.npy']
+    raw_path, = [path for path in recorder.paths if path.suffix == '.bin']
+    recorded = np.load(npy_path)
+    np.testing.assert_array_equal(recorded[:, 1:], rows)
+    assert b"".join(data for direction, timestamp, data in read_raw_log(raw_path)) == payload
+    assert recorder.error is None
+
+
+def test_csv_rows_always_match_the_header(tmp_path):
+    recorder = Recorder(tmp_path, raw_log=False)
+    now = time.time()
+    recorder.write_batch(Batch(now, [b"1,2,3"]))
+    recorder.write_batch(Batch(now, [b"1,2,3,4,5"]))
+    recorder.write_batch(Batch(now, [b"1,2,3,4"]))
+    csv_path, = recorder.finalize()
+    header, *lines = csv_path.read_text().splitlines()
+    assert header == "Timestamp,MTQ time,Gyro X,Gyro Y,Gyro Z"
+    assert all(line.count(",") == 4 for line in lines)
+    log = SessionLog.load(csv_path)
+    np.testing.assert_array_equal(log.values, [[1, 2, 3, np.nan], [1, 2, 3, 4], [1, 2, 3, 4]])
+
+
+def test_sessions_never_overwrite_each_other(tmp_path):
+    paths = []
+    for session in range(3):
+        recorder = Recorder(tmp_path, raw_log=False)
+        recorder._stamp = recorder.base_name = "MTQ_same_millisecond"
+        recorder.write_batch(Batch(time.time(), [b"%d,2,3,4" % session]))
+        paths.extend(recorder.finalize())
+    assert [path.name for path in paths] == ["MTQ_same_millisecond.csv", "MTQ_same_millisecond-1.csv", "MTQ_same_millisecond-2.csv"]
+    assert [path.read_text().splitlines()[1].split(", ")[1] for path in paths] == ["0.000000", "1.000000", "2.000000"]
+
+
+def test_failed_recorder_detaches_and_finalize_does_not_raise(tmp_path, wait_for):
+    port = ReplayPort()
+    ingest = SerialIngest(port)
+    recorder = Recorder(tmp_path, flush_interval=0.05)
+    recorder.attach(ingest)
+    recorder.start()
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+    recorder.write_batch = disk_full
+    recorder.samples.put(Batch(time.time(), [b"1,2,3,4"]))
+    assert wait_for(lambda: recorder.error is not None)
+    assert recorder._on_raw not in ingest._raw_listeners
+    recorder._raw_file.close = disk_full
+    recorder.finalize()
+    assert recorder.error.errno == 28
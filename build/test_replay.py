@@ -0,0 +1,47 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from frame_codec import FrameLayout
+from log_viewer import SessionLog
+from replay import latency_percentiles, load_session, replay
+
+CAPTURE = Path(__file__).with_name("output.csv")
+TELEMETRY_ROWS = 225   # output.csv also holds 51 console hex dumps
+
+
+def test_replay_output_csv_through_the_pipeline(tmp_path):
+    chunks = load_session(CAPTURE)
+    assert len(chunks) == TELEMETRY_ROWS + 51
+    offsets = [t for t, data in chunks]
+    assert offsets[0] == 0 and all(b >= a for a, b in zip(offsets, offsets[1:]))
+
+    pipeline, pacer, elapsed = replay(chunks, speed=0, record_dir=tmp_path, timeout=30)
+    assert pipeline.stages["decode"].samples == TELEMETRY_ROWS
+    assert pipeline.garbled == 51
+    assert len(pipeline.store) == TELEMETRY_ROWS
+    assert pipeline.renderer.frames >= 1
+    assert pipeline.stages["console"].samples == len(chunks)
+    assert set(latency_percentiles(pipeline.latencies)) == {50, 90, 99, 100}
+
+    # the replayed samples match the capture's telemetry rows
+    # loaded from a copy, SessionLog caches parsed CSVs next to the file
+    expected = SessionLog.load(shutil.copy(CAPTURE, tmp_path / "capture.csv")).values
+    timestamps, data = pipeline.store.window()
+    np.testing.assert_allclose(data.T, expected, rtol=1e-6)
+    csv_path, = [path for path in pipeline.recorder.paths if path.suffix == '.csv']
+    np.testing.assert_allclose(SessionLog.load(csv_path).values, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("use_pty", [False, pytest.param(True, marks=pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty"))])
+def test_replay_output_csv_as_binary_frames(use_pty):
+    layout = FrameLayout()
+    chunks = load_session(CAPTURE, layout=layout)
+    assert len(chunks) == TELEMETRY_ROWS
+    pipeline, pacer, elapsed = replay(chunks, speed=0, layout=layout, use_pty=use_pty, render=False, timeout=30)
+    assert pipeline.stages["decode"].samples == TELEMETRY_ROWS
+    assert pipeline.garbled == 0
+    assert pipeline.ingest.framer.corrupt_frames == 0
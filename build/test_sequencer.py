@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from sequencer import POWER_COMMAND, CoalescingSender, CommandSequencer, load_profile
+
+COMMANDS = {"MTQ ON": [b'\x3A', b'\x01'], POWER_COMMAND: [b'\x38', b'\x00'], "MTQ OFF": [b'\x3A', b'\x00']}
+
+
+def _encode(reg_id, data):
+    return (reg_id, tuple(data) if isinstance(data, list) else data)
+
+
+def _sequencer(send=None):
+    return CommandSequencer(send or (lambda frame: None), _encode, COMMANDS, min_power=-2000, max_power=2000)
+
+
+def test_build_schedules_every_step_type():
+    schedule = _sequencer().build([
+        {"command": "MTQ ON", "hold": 0.5},
+        {"power": [100, -100, 2500]},
+        {"ramp": {"from": [0, 0, 0], "to": [400, 0, -400], "duration": 1, "rate": 4}},
+        {"wait": 2},
+        {"sine": {"amplitude": [1000, 0, 0], "frequency": 0.25, "duration": 1, "rate": 1}, "hold": 1},
+        {"command": "MTQ OFF"},
+    ])
+    times = [t for t, label, frame in schedule]
+    assert times == [0.0, 0.5, 0.5, 0.75, 1.0, 1.25, 1.5, 3.5, 4.5, 5.5]
+    assert schedule[0][2] == (b'\x3A', b'\x01')
+    assert schedule[1][2] == (b'\x38', (100, -100, 2000))   # clamped to the slider range
+    assert [frame[1] for t, label, frame in schedule[2:7]] == [(0, 0, 0), (100, 0, -100), (200, 0, -200), (300, 0, -300), (400, 0, -400)]
+    assert [frame[1][0] for t, label, frame in schedule[7:9]] == [0, 1000]
+    assert schedule[-1][1] == "MTQ OFF"
+
+
+@pytest.mark.parametrize("step", [
+    {"command": "NOPE"},
+    {"command": POWER_COMMAND},
+    {"ramp": {"from": [0, 0, 0], "to": [1, 1, 1], "duration": 1, "rate": 0}},
+    {"sine": {"amplitude": [1, 1, 1], "frequency": 1, "duration": -1, "rate": 10}},
+    {"sine": {"amplitude": [1, 1, 1], "frequency": 1, "duration": 1, "rate": float("nan")}},
+    {"jump": 3},
+])
+def test_build_rejects_invalid_steps(step):
+    with pytest.raises(ValueError):
+        _sequencer().build([step])
+
+
+def test_run_sends_the_schedule_in_order():
+    sent = []
+    sequencer = _sequencer(sent.append)
+    sequencer.start([{"command": "MTQ ON"}, {"ramp": {"from": [0, 0, 0], "to": [10, 10, 10], "duration": 0.1, "rate": 50}}])
+    sequencer._thread.join(timeout=5)
+    assert sent == [frame for t, label, frame in sequencer.schedule]
+    assert sequencer.sent == len(sent) and sequencer.error is None
+    mean, p99, worst = sequencer.jitter_stats()
+    assert 0 <= mean <= worst
+
+
+def test_load_profile_requires_a_list(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text('{"command": "MTQ ON"}')
+    with pytest.raises(ValueError):
+        load_profile(path)
+
+
+def test_coalescing_sender_sends_only_the_latest_frame(wait_for):
+    sent = []
+    release = threading.Event()
+    first_sent = threading.Event()
+
+    def send(frame):
+        sent.append(frame)
+        first_sent.set()
+        release.wait(5)
+
+    sender = CoalescingSender(send, max_rate=1000)
+    sender.submit(0)
+    assert first_sent.wait(5)
+    # the sender is busy with frame 0, everything submitted meanwhile collapses into the newest
+    for frame in range(1, 50):
+        sender.submit(frame)
+    release.set()
+    assert wait_for(lambda: sent[-1] == 49)
+    sender.stop()
+    assert sent == [0, 49]
+    assert sender.sent == 2 and sender.coalesced == 48
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from replay import open_pty_port
+from serial_ingest import BatchQueue, LineFramer, SerialIngest
+
+
+def test_line_framer_handles_records_split_anywhere():
+    stream = b"465.4, 0.84, -1.05\r\n465.5, 0.91, -1.05\r\n\r\n465.6, 0.88, -1.02\r\n"
+    expected = [b"465.4, 0.84, -1.05", b"465.5, 0.91, -1.05", b"", b"465.6, 0.88, -1.02"]
+    for split in range(1, len(stream)):
+        framer = LineFramer(terminator=b'\r\n')
+        assert framer.feed(stream[:split]) + framer.feed(stream[split:]) == expected
+        assert not framer.buffer
+
+
+def test_line_framer_drops_overlong_garbage():
+    framer = LineFramer(max_length=16)
+    assert framer.feed(b"x" * 20) == []
+    assert framer.overruns == 1
+    assert framer.feed(b"1,2\n") == [b"1,2"]
+
+
+def test_batch_queue_overflow_policies():
+    oldest = BatchQueue(maxsize=2, overflow="drop_oldest")
+    newest = BatchQueue(maxsize=2, overflow="drop_newest")
+    for item in range(4):
+        oldest.put(item)
+        newest.put(item)
+    assert oldest.drain() == [2, 3] and oldest.dropped == 2
+    assert newest.drain() == [0, 1] and newest.dropped == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_serial_ingest_over_pty(wait_for):
+    master, port = open_pty_port()
+    ingest = SerialIngest(port)
+    subscription = ingest.subscribe(maxsize=65536)
+    lines = [b"%d, %f, %f, %f" % (idx, idx * 0.1, -idx * 0.1, 0.5) for idx in range(5000)]
+    received = []
+    ingest.start()
+    try:
+        stream = memoryview(b"\n".join(lines) + b"\n")
+        while stream:
+            stream = stream[os.write(master, stream[:4096]):]
+        assert wait_for(lambda: received.extend(record for batch in subscription.drain() for record in batch.records)
+                        or len(received) >= len(lines))
+        ingest.write(b"#C\x10\x01")
+        assert wait_for(lambda: ingest.bytes_out == 4)
+        assert os.read(master, 16) == b"#C\x10\x01"
+    finally:
+        ingest.stop()
+        port.close()
+        os.close(master)
+    assert received == lines
+    assert ingest.error is None
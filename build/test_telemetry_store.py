@@ -0,0 +1,61 @@
+import numpy as np
+
+from telemetry_store import TelemetryStore, parse_text_records
+
+
+def test_store_window_and_minmax_match_brute_force():
+    rng = np.random.default_rng(1)
+    store = TelemetryStore(capacity=1000, channels=("a", "b", "c"), block_size=64)
+    times, rows = np.empty(0), np.empty((0, 3))
+    # several wraps of the ring, with chunk sizes that straddle block and capacity boundaries
+    for chunk in rng.integers(1, 300, size=40):
+        new_times = times[-1] + 1 + np.arange(chunk) if len(times) else np.arange(chunk, dtype=float)
+        new_rows = rng.normal(size=(chunk, 3)) * rng.uniform(1, 100)
+        new_rows[rng.random(chunk) < 0.05, 1] = np.nan
+        if chunk % 5:
+            store.extend(new_times, new_rows)
+        else:
+            for t, row in zip(new_times, new_rows):
+                store.append(t, row)
+        times, rows = np.concatenate([times, new_times]), np.concatenate([rows, new_rows])
+        for n in (1, 63, 64, 65, 500, 1023, 1024, None):
+            expected = min(n or len(times), len(times), store.capacity)
+            window_times, window_rows = store.window(n)
+            np.testing.assert_array_equal(window_times, times[-expected:])
+            np.testing.assert_array_equal(window_rows, rows[-expected:].T)
+            for channels in ([0], [1], [0, 2], None):
+                selected = rows[-expected:][:, channels if channels is not None else slice(None)]
+                # NaN marks missing values; an all-NaN selection gives NaN
+                np.testing.assert_array_equal(store.minmax(channels, n), (np.fmin.reduce(selected, axis=None), np.fmax.reduce(selected, axis=None)))
+
+
+def test_store_add_channels_keeps_samples():
+    store = TelemetryStore(capacity=256, channels=("a",), block_size=64)
+    store.extend(np.arange(3.0), np.array([[1.0], [2.0], [3.0]]))
+    store.add_channels(1)
+    store.append(3.0, [4.0, 5.0])
+    times, data = store.window()
+    np.testing.assert_array_equal(times, [0, 1, 2, 3])
+    np.testing.assert_array_equal(data[0], [1, 2, 3, 4])
+    np.testing.assert_array_equal(data[1], [np.nan, np.nan, np.nan, 5])
+    assert store.time_span() == (0.0, 3.0)
+
+
+def test_parse_text_records_fast_path_and_fallback():
+    rows, garbled = parse_text_records([b"1.5, 2, 3, 4", b"5, 6, 7, 8", b"  "])
+    np.testing.assert_array_equal(rows, [[1.5, 2, 3, 4], [5, 6, 7, 8]])
+    assert garbled == 0
+    rows, garbled = parse_text_records([b"1,2,3,4", b"34  37  35", b"1,2,3", b"x,y,z,w"])
+    np.testing.assert_array_equal(rows, [[1, 2, 3, 4]])
+    assert garbled == 3
+
+
+def test_parse_text_records_breaks_width_ties_deliberately():
+    # one valid 3-field line against one 2-field line: the expected width, then the widest, wins
+    rows, garbled = parse_text_records([b"1,2,3", b"x,2,3", b"1,2"], width=3)
+    np.testing.assert_array_equal(rows, [[1, 2, 3]])
+    assert garbled == 2
+    rows, garbled = parse_text_records([b"1,2", b"1,2,3"])
+    np.testing.assert_array_equal(rows, [[1, 2, 3]])
+    rows, garbled = parse_text_records([b"1,2,3", b"1,2,3,4"])
+    np.testing.assert_array_equal(rows, [[1, 2, 3, 4]])